@@ -1,24 +1,18 @@
 import os
 import json
 import re
-from PIL import Image
-import numpy as np
 import base64
+from WildPromptor_ImageOps import to_pil_images
 
 class WildPromptorAI:
+    # Fixed start of format_prompt's text; models can cache its keys/values once (see WildPromptor_PrefixCache)
+    PROMPT_PREFIX = "Based on these keywords:"
+
     @staticmethod
-    def tensor_to_image(tensor):
-        tensor = tensor.cpu().clamp(0, 1).mul(255).byte().numpy()
-        if tensor.ndim == 4:
-            tensor = tensor.squeeze(0)
-        if tensor.ndim == 3:
-            if tensor.shape[0] == 1:
-                tensor = np.repeat(tensor[0], 3, axis=0)
-            elif tensor.shape[0] == 3:
-                tensor = np.transpose(tensor, (1, 2, 0))
-        elif tensor.ndim == 2:
-            tensor = np.stack([tensor] * 3, axis=-1)
-        return Image.fromarray(tensor, mode='RGB')
+    def tensor_to_image(tensor, max_side=None):
+        if tensor.dim() == 4:
+            tensor = tensor[:1]
+        return to_pil_images(tensor, max_side)[0]
 
     @staticmethod
     def INPUT_TYPES():
@@ -55,7 +49,7 @@ class WildPromptorAI:
         return text.strip()
 
     def format_prompt(self, keywords):
-        return f"Based on these keywords: {keywords}\nCreate a single, concise paragraph describing an image. Focus only on the visual elements without mentioning prompt creation or image generation. Avoid sections, bullet points, or style suggestions."
+        return f"{self.PROMPT_PREFIX} {keywords}\nCreate a single, concise paragraph describing an image. Focus only on the visual elements without mentioning prompt creation or image generation. Avoid sections, bullet points, or style suggestions."
 
     def format_image_prompt(self, keywords):
         if keywords.strip():
@@ -0,0 +1,137 @@
+import os
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, Optional
+from WildPromptor_LazyImport import lazy_import
+from WildPromptor_ModelRegistry import get_ai_config
+
+torch = lazy_import("torch")
+
+try:
+    import folder_paths
+    QUANTIZED_DIR = os.path.join(folder_paths.models_dir, "LLM", "quantized")
+except ImportError:
+    QUANTIZED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "quantized")
+
+DEFAULT_PROFILE = {
+    "quantize": False,
+    "num_threads": 0,
+    "interop_threads": 0,
+    "inference_mode": True,
+}
+
+_threads_applied = False
+
+
+def cpu_profile(model_id: str, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """config_ai.json "cpu_profiles": "default" settings overridden by the entry for `model_id`."""
+    profiles = (config if config is not None else get_ai_config()).get("cpu_profiles", {})
+    profile = dict(DEFAULT_PROFILE)
+    profile.update(profiles.get("default", {}))
+    profile.update(profiles.get(model_id, {}))
+    return profile
+
+
+def apply_thread_settings(profile: Dict[str, Any]):
+    """Set torch's intra-op and inter-op thread counts (0 keeps torch's default).
+
+    Thread pools are process-wide and torch only accepts the inter-op count
+    before any parallel work has run, so only the first profile applied counts.
+    """
+    global _threads_applied
+    if _threads_applied:
+        return
+    _threads_applied = True
+    if profile.get("num_threads"):
+        torch.set_num_threads(int(profile["num_threads"]))
+    if profile.get("interop_threads"):
+        try:
+            torch.set_num_interop_threads(int(profile["interop_threads"]))
+        except RuntimeError as e:
+            print(f"[CpuProfile] Inter-op threads not changed: {e}")
+
+
+def inference_context(profile: Optional[Dict[str, Any]]):
+    """torch.inference_mode() when the profile enables it, else no_grad()."""
+    if profile is None:
+        return nullcontext()
+    return torch.inference_mode() if profile.get("inference_mode", True) else torch.no_grad()
+
+
+def conv1d_to_linear(model):
+    """Replace transformers' Conv1D (GPT-2 style) layers with equivalent nn.Linear.
+
+    quantize_dynamic only handles nn.Linear; GPT-2 derived models keep their
+    attention and MLP projections in Conv1D, whose weight is stored transposed.
+    """
+    for module in list(model.modules()):
+        for name, child in list(module.named_children()):
+            if type(child).__name__ != "Conv1D":
+                continue
+            in_features, out_features = child.weight.shape
+            linear = torch.nn.Linear(in_features, out_features, bias=child.bias is not None)
+            with torch.no_grad():
+                linear.weight.copy_(child.weight.t())
+                if child.bias is not None:
+                    linear.bias.copy_(child.bias)
+            setattr(module, name, linear)
+    return model
+
+
+def hub_revision(model_id: str) -> Optional[str]:
+    """Commit hash of the locally cached Hugging Face snapshot of `model_id`, if any."""
+    try:
+        import huggingface_hub
+        path = huggingface_hub.try_to_load_from_cache(model_id, "config.json")
+        if isinstance(path, str):
+            return os.path.basename(os.path.dirname(path))
+    except Exception:
+        pass
+    return None
+
+
+def quantize(model):
+    """Dynamic int8 quantization of every Linear layer."""
+    model = conv1d_to_linear(model)
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def quantized_path(model_id: str, revision) -> str:
+    safe_id = model_id.replace("/", "--")
+    return os.path.join(QUANTIZED_DIR, f"{safe_id}-{revision or 'local'}-torch{torch.__version__}.pt")
+
+
+def load_for_cpu(model_id: str, revision, load_fp32: Callable[[], Any], profile: Dict[str, Any]):
+    """Load a model for CPU inference according to `profile`.
+
+    With "quantize" on, the int8 model is pickled under models/LLM/quantized,
+    keyed by model id, snapshot revision and torch version, and later loads
+    read it directly without building the fp32 model first.
+    """
+    apply_thread_settings(profile)
+    if not profile.get("quantize"):
+        return load_fp32()
+
+    path = quantized_path(model_id, revision)
+    if os.path.exists(path):
+        try:
+            start_time = time.perf_counter()
+            model = torch.load(path, weights_only=False)
+            model.eval()
+            print(f"[CpuProfile] Loaded int8 {model_id} from cache in {time.perf_counter() - start_time:.2f}s")
+            return model
+        except Exception as e:
+            print(f"[CpuProfile] Quantized cache unreadable, rebuilding: {e}")
+
+    start_time = time.perf_counter()
+    model = quantize(load_fp32())
+    model.eval()
+    print(f"[CpuProfile] Quantized {model_id} in {time.perf_counter() - start_time:.2f}s")
+    try:
+        os.makedirs(QUANTIZED_DIR, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        torch.save(model, temp_path)
+        os.replace(temp_path, path)
+    except Exception as e:
+        print(f"[CpuProfile] Could not cache quantized model: {e}")
+    return model
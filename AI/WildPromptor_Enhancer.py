@@ -1,8 +1,15 @@
 import os
-import torch
 import folder_paths
-from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
-from huggingface_hub import snapshot_download
+from WildPromptor_LazyImport import lazy_import
+from WildPromptor_ModelRegistry import get_registry
+from WildPromptor_MicroBatch import get_batcher
+from WildPromptor_ResultCache import get_result_cache, make_key, model_revision
+from WildPromptor_CpuProfile import DEFAULT_PROFILE, cpu_profile, load_for_cpu, inference_context
+from WildPromptor_Sampling import SeededSampler, item_seeds
+
+torch = lazy_import("torch")
+transformers = lazy_import("transformers")
+huggingface_hub = lazy_import("huggingface_hub")
 
 MODEL_PATH = os.path.join(folder_paths.models_dir, "LLM", "Prompt-Enhance")
 os.makedirs(MODEL_PATH, exist_ok=True)
@@ -11,12 +18,15 @@ class WildPromptor_Enhancer:
     def __init__(self):
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.model_checkpoint = "1038lab/Prompt-Enhance"
+        self.max_target_length = 512
+        self.prefix = "enhance prompt: "
+
+    def load_model(self):
         print(f"Using device: {self.device}")
-        
         if not os.listdir(MODEL_PATH):
             print(f"Downloading {self.model_checkpoint} model...")
             try:
-                snapshot_download(
+                huggingface_hub.snapshot_download(
                     repo_id=self.model_checkpoint,
                     local_dir=MODEL_PATH,
                     local_dir_use_symlinks=False
@@ -28,29 +38,80 @@ class WildPromptor_Enhancer:
         
         try:
             print("Loading model and tokenizer...")
-            self.tokenizer = AutoTokenizer.from_pretrained(MODEL_PATH)
-            self.model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_PATH)
-            
-            self.pipe = pipeline(
-                'text2text-generation',
-                model=self.model,
-                tokenizer=self.tokenizer,
-                repetition_penalty=1.2,
-                device=self.device
-            )
+            tokenizer = transformers.AutoTokenizer.from_pretrained(MODEL_PATH)
+            profile = self.cpu_profile()
+            if profile is not None:
+                model = load_for_cpu(self.model_checkpoint, model_revision(MODEL_PATH),
+                                     lambda: transformers.AutoModelForSeq2SeqLM.from_pretrained(MODEL_PATH), profile)
+            else:
+                model = transformers.AutoModelForSeq2SeqLM.from_pretrained(MODEL_PATH).to(self.device)
+            model.eval()
             print("Model loaded successfully!")
         except Exception as e:
             print(f"Error loading model: {str(e)}")
             raise RuntimeError(f"Failed to load model: {str(e)}")
-            
-        self.max_target_length = 512
-        self.prefix = "enhance prompt: "
+        return {"model": model, "tokenizer": tokenizer, "cpu_profile": profile}
+
+    def cpu_profile(self):
+        """The CPU profile the model is loaded with, None on GPU."""
+        return cpu_profile(self.model_checkpoint) if self.device == "cpu" else None
+
+    def run_batch(self, items, batch_size, max_new_tokens=None):
+        """Enhance (prompt, seed) items; the seeds must be all zero or all non-zero."""
+        prompts = [prompt for prompt, _ in items]
+        seeds = [seed for _, seed in items]
+        with get_registry().use(f"enhancer:{self.model_checkpoint}", self.load_model) as bundle:
+            with inference_context(bundle["cpu_profile"] or DEFAULT_PROFILE):
+                return self.generate_batched(bundle["model"], bundle["tokenizer"], prompts, seeds, batch_size,
+                                             max_new_tokens)
+
+    def generate_batched(self, model, tokenizer, prompts, seeds, batch_size, max_new_tokens=None):
+        """Return `batch_size` enhanced prompts for each input prompt, in input order.
+
+        Inputs are sorted by token length and padded into chunks of at most
+        MAX_BATCH_ROWS rows, each chunk one `generate` call. Sampled item k of
+        prompt i uses seeds[i] + k through its own generator, so results don't
+        depend on batch composition. Seed 0 decodes greedily, which gives the
+        same text for every item, so each prompt is generated once.
+        Output length is capped by `max_new_tokens` when given (the preload
+        warmup), otherwise by max_target_length.
+        """
+        do_sample = any(seeds)
+        samples = batch_size if do_sample else 1
+
+        encoded = tokenizer([self.prefix + p for p in prompts])["input_ids"]
+        order = sorted(range(len(prompts)), key=lambda i: len(encoded[i]))
+        prompts_per_chunk = max(1, self.MAX_BATCH_ROWS // samples)
+        results = [None] * len(prompts)
+
+        for start in range(0, len(order), prompts_per_chunk):
+            chunk = order[start:start + prompts_per_chunk]
+            rows = [encoded[i] for i in chunk for _ in range(samples)]
+            inputs = tokenizer.pad({"input_ids": rows}, return_tensors="pt").to(model.device)
+
+            generate_kwargs = {"repetition_penalty": 1.2, "do_sample": False}
+            if max_new_tokens:
+                generate_kwargs["max_new_tokens"] = max_new_tokens
+            else:
+                generate_kwargs["max_length"] = self.max_target_length
+            if do_sample:
+                row_seeds = [s for i in chunk for s in item_seeds(seeds[i], samples)]
+                sampler = SeededSampler(row_seeds, device=model.device, **self.SAMPLING)
+                generate_kwargs["logits_processor"] = transformers.LogitsProcessorList([sampler])
+
+            outputs = model.generate(**inputs, **generate_kwargs)
+            texts = tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+            for j, i in enumerate(chunk):
+                group = texts[j * samples:(j + 1) * samples]
+                results[i] = group if do_sample else group * batch_size
+        return results
 
     @classmethod
     def INPUT_TYPES(cls):
         return {
             "required": {
-                "prompt": ("STRING", {"multiline": True, "tooltip": "Input prompt to be enhanced"}),
+                "prompt": ("STRING", {"multiline": True, "tooltip": "Input prompt to be enhanced. A list of prompts is enhanced in padded batches"}),
                 "batch_size": ("INT", {"default": 1, "min": 1, "max": 20, "tooltip": "Number of enhanced prompts to generate"}),
                 "combine_output": ("BOOLEAN", {"default": False, "tooltip": "Combine all outputs into one string or output as separate records"}),
                 "seed": ("INT", {"default": 0, "min": 0, "max": 0xffffffffffffffff})
@@ -59,41 +120,51 @@ class WildPromptor_Enhancer:
 
     RETURN_TYPES = ("STRING",)
     RETURN_NAMES = ("prompt",)
+    INPUT_IS_LIST = True
     OUTPUT_IS_LIST = (True,)
     FUNCTION = "enhancer"
     CATEGORY = "🧪AILab/🤖AI"
     class_type = "WildPromptor_Enhancer"
+    # Upper bound on rows (prompts x samples) per generate call
+    MAX_BATCH_ROWS = 32
+    SAMPLING = {"temperature": 0.7, "top_k": 50, "top_p": 0.95}
 
     def enhancer(self, prompt, seed, batch_size, combine_output):
-        if not prompt or prompt.isspace():
+        # INPUT_IS_LIST: prompt may hold many prompts, the widgets hold one value each
+        seed, batch_size, combine_output = seed[0], batch_size[0], combine_output[0]
+        prompts = [p for p in prompt if p and not p.isspace()]
+        if not prompts:
             return ([],)
             
-        enhanced_prompts = []
-        input_text = self.prefix + prompt
-        
-        try:
-            for i in range(batch_size):
-                output_seed = seed + i if seed != 0 else 0
-                torch.manual_seed(output_seed)
-                
-                do_sample = output_seed != 0
-                temperature = 0.7 if do_sample else 0.0
-
-                result = self.pipe(
-                    input_text,
-                    max_length=self.max_target_length,
-                    do_sample=do_sample,
-                    temperature=temperature,
-                    num_return_sequences=1,
-                    top_k=50,
-                    top_p=0.95,
-                )
-                
-                enhanced_prompts.append(result[0]['generated_text'])
-                
-        except Exception as e:
-            print(f"Error during prompt enhancement: {str(e)}")
-            return ([f"Error: {str(e)}"],)
+        # Greedy and seeded sampling are both deterministic per prompt, so every result is cacheable
+        cache = get_result_cache()
+        revision = model_revision(MODEL_PATH)
+        # An int8 model on CPU and the fp32 model on GPU don't produce the same text
+        runtime = {"device": self.device, "cpu_profile": self.cpu_profile()}
+        keys = [make_key(node="WildPromptor_Enhancer", model=self.model_checkpoint, revision=revision, prompt=p,
+                         seed=seed, batch_size=batch_size, max_length=self.max_target_length, sampling=self.SAMPLING,
+                         runtime=runtime)
+                for p in prompts]
+        results = [cache.get(key) if cache else None for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+
+        if missing:
+            try:
+                # Requests with the same settings, from this list or concurrent runs, share batches.
+                # Seeds travel with the items; only greedy vs. sampled decoding can't be mixed.
+                batcher = get_batcher(("enhancer", self.model_checkpoint, batch_size, seed != 0))
+                generated = batcher.submit([(prompts[i], seed) for i in missing],
+                                           lambda batch: self.run_batch(batch, batch_size),
+                                           sort_key=lambda item: len(item[0]))
+            except Exception as e:
+                print(f"Error during prompt enhancement: {str(e)}")
+                return ([f"Error: {str(e)}"],)
+            for i, texts in zip(missing, generated):
+                results[i] = texts
+                if cache:
+                    cache.put(keys[i], texts)
+
+        enhanced_prompts = [text for texts in results for text in texts]
             
         if combine_output:
             return (["\n---\n".join(enhanced_prompts)],)
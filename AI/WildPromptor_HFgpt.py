@@ -1,8 +1,15 @@
 from WildPromptorAI import WildPromptorAI
-from transformers import AutoModelForCausalLM, AutoTokenizer
+from WildPromptor_LazyImport import lazy_import
+from WildPromptor_ModelRegistry import get_registry
+from WildPromptor_MicroBatch import get_batcher
+from WildPromptor_PrefixCache import PrefixCache
+from WildPromptor_CpuProfile import cpu_profile, load_for_cpu, inference_context, hub_revision
+from WildPromptor_Streaming import InterruptCriteria, TokenStreamer, check_interrupted
 import json
 import os
 
+transformers = lazy_import("transformers")
+
 class WildPromptor_HFgpt(WildPromptorAI):
     @classmethod
     def INPUT_TYPES(cls):
@@ -12,11 +19,19 @@ class WildPromptor_HFgpt(WildPromptorAI):
                 "model_repo": (cls.get_hfgpt_repos(),),
                 "max_length": ("INT", {"default": 1024, "min": 1, "max": 4096, "step": 1}),
                 "temperature": ("FLOAT", {"default": 0.7, "min": 0.1, "max": 2.0, "step": 0.1}),
-            }
+            },
+            "optional": {
+                "stream": ("BOOLEAN", {"default": False, "tooltip": "Show text in connected Show Prompt nodes as it is generated. Prompts then run one at a time instead of batched"}),
+            },
+            "hidden": {
+                "unique_id": "UNIQUE_ID",
+            },
         }
 
     RETURN_TYPES = ("STRING",)
     RETURN_NAMES = ("prompt",)
+    INPUT_IS_LIST = True
+    OUTPUT_IS_LIST = (True,)
     FUNCTION = "generate_prompt"
     CATEGORY = "🧪AILab/🤖AI"
 
@@ -32,34 +47,78 @@ class WildPromptor_HFgpt(WildPromptorAI):
             print(f"Error loading HFGPT repos: {str(e)}")
             return ["Configuration loading failed"]
 
-    def __init__(self):
-        super().__init__()
-        self.models = {}
-        self.tokenizers = {}
+    def load_model(self, model_repo):
+        # HFgpt models always run on the CPU
+        profile = cpu_profile(model_repo)
+        model = load_for_cpu(model_repo, hub_revision(model_repo),
+                             lambda: transformers.AutoModelForCausalLM.from_pretrained(model_repo), profile)
+        model.eval()
+        tokenizer = transformers.AutoTokenizer.from_pretrained(model_repo)
+        # Batched generation with a decoder-only model needs left padding
+        tokenizer.padding_side = "left"
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        return {"model": model, "tokenizer": tokenizer, "prefix_caches": {}, "cpu_profile": profile}
+
+    def get_prefix_cache(self, bundle):
+        prefix_caches = bundle["prefix_caches"]
+        prefix_cache = prefix_caches.get(self.PROMPT_PREFIX)
+        if prefix_cache is None:
+            prefix_cache = PrefixCache(bundle["model"], bundle["tokenizer"], self.PROMPT_PREFIX)
+            prefix_caches[self.PROMPT_PREFIX] = prefix_cache
+        return prefix_cache
+
+    def generate_batch(self, prompts, model_repo, temperature, max_length, node_id=None, max_new_tokens=None):
+        # max_length counts the prompt too; max_new_tokens, when given, bounds only the generated text
+        with get_registry().use(f"hfgpt:{model_repo}", lambda: self.load_model(model_repo)) as bundle, \
+                inference_context(bundle["cpu_profile"]):
+            model, tokenizer = bundle["model"], bundle["tokenizer"]
+            suffixes = None
+            if self.config.get("prefix_cache", False):
+                prefix_cache = self.get_prefix_cache(bundle)
+                suffixes = prefix_cache.split(tokenizer, prompts)
+            if suffixes is not None:
+                inputs = prefix_cache.build_inputs(suffixes, tokenizer.pad_token_id, model.device)
+            else:
+                inputs = tokenizer(prompts, return_tensors='pt', padding=True)
 
-    def generate_prompt(self, keywords, model_repo, temperature=0.7, max_length=256):
-        if model_repo not in self.models:
-            self.models[model_repo] = AutoModelForCausalLM.from_pretrained(model_repo)
-            self.tokenizers[model_repo] = AutoTokenizer.from_pretrained(model_repo)
-            self.models[model_repo].eval()
+            outputs = model.generate(
+                **inputs,
+                **({"max_new_tokens": max_new_tokens} if max_new_tokens else {"max_length": max_length}),
+                num_return_sequences=1,
+                temperature=temperature,
+                do_sample=True,
+                no_repeat_ngram_size=2,
+                pad_token_id=tokenizer.pad_token_id,
+                stopping_criteria=transformers.StoppingCriteriaList([InterruptCriteria()]),
+                streamer=TokenStreamer(tokenizer, node_id) if node_id is not None else None
+            )
 
-        prompt = self.format_prompt(keywords)
-        input_ids = self.tokenizers[model_repo](prompt, return_tensors='pt').input_ids
+            generated = tokenizer.batch_decode(outputs, skip_special_tokens=True)
+        return [self.clean_prompt(text) for text in generated]
 
-        outputs = self.models[model_repo].generate(
-            input_ids,
-            max_length=max_length,
-            num_return_sequences=1,
-            temperature=temperature,
-            do_sample=True,
-            no_repeat_ngram_size=2
-        )
+    def generate_prompt(self, keywords, model_repo, temperature=(0.7,), max_length=(256,), stream=(False,), unique_id=(None,)):
+        # INPUT_IS_LIST: keywords may hold many entries, the widgets hold one value each
+        model_repo, temperature, max_length = model_repo[0], temperature[0], max_length[0]
+        stream, unique_id = stream[0], unique_id[0]
+        prompts = [self.format_prompt(k) for k in keywords]
 
-        generated_prompt = self.tokenizers[model_repo].decode(outputs[0], skip_special_tokens=True)
-        generated_prompt = self.clean_prompt(generated_prompt)
+        if stream:
+            generated_prompts = []
+            for prompt in prompts:
+                generated_prompts += self.generate_batch([prompt], model_repo, temperature, max_length, node_id=unique_id)
+                check_interrupted()
+        else:
+            # Requests for the same model and settings, from this list or concurrent runs, share batches
+            batcher = get_batcher(("hfgpt", model_repo, temperature, max_length))
+            generated_prompts = batcher.submit(prompts,
+                                               lambda batch: self.generate_batch(batch, model_repo, temperature, max_length),
+                                               sort_key=len)
+            check_interrupted()
 
-        print(f"[HuggingFace GPT prompt]:\n{generated_prompt}")
-        return (generated_prompt,)
+        for generated_prompt in generated_prompts:
+            print(f"[HuggingFace GPT prompt]:\n{generated_prompt}")
+        return (generated_prompts,)
 
-NODE_CLASS_MAPPINGS = {"WildPromptor_HFgpt}
+NODE_CLASS_MAPPINGS = {"WildPromptor_HFgpt": WildPromptor_HFgpt}
 NODE_DISPLAY_NAME_MAPPINGS = {"WildPromptor_HFgpt": "HuggingFace GPT 🤖(WildPromptor)"}
\ No newline at end of file
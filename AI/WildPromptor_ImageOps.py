@@ -0,0 +1,109 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from PIL import Image, ImageOps
+from WildPromptor_LazyImport import lazy_import
+
+torch = lazy_import("torch")
+
+_END = object()
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp", ".gif", ".tif", ".tiff")
+
+
+def to_nhwc(images):
+    """View an IMAGE tensor (NHWC, HWC, CHW or HW) as NHWC without copying."""
+    if images.dim() == 2:
+        return images[None, :, :, None]
+    if images.dim() == 3:
+        # ComfyUI images are HWC; accept CHW for tensors from other sources
+        if images.shape[0] in (1, 3, 4) and images.shape[-1] not in (1, 3, 4):
+            images = images.permute(1, 2, 0)
+        return images[None]
+    if images.dim() == 4:
+        return images
+    raise ValueError(f"Unsupported image tensor shape: {tuple(images.shape)}")
+
+
+def fit_size(height: int, width: int, max_side: Optional[int]):
+    """(height, width) scaled down so neither side exceeds max_side; unchanged when it already fits."""
+    if not max_side or max(height, width) <= max_side:
+        return height, width
+    scale = max_side / max(height, width)
+    return max(1, round(height * scale)), max(1, round(width * scale))
+
+
+def to_uint8_batch(images, max_side: Optional[int] = None) -> np.ndarray:
+    """Convert an IMAGE batch to one contiguous (N, H, W, 3) uint8 array.
+
+    Frames are converted one at a time into a preallocated buffer, so the only
+    float temporary is a single scaled frame. Grayscale is broadcast to RGB and
+    alpha is dropped during the copy. Downscaling (area interpolation) and
+    conversion run on the tensor's device, so only uint8 data crosses to the
+    CPU. Values are clamped to [0, 1] and truncated like `.mul(255).byte()`.
+    """
+    images = to_nhwc(images.detach())
+    count, height, width, channels = images.shape
+    out_height, out_width = fit_size(height, width, max_side)
+    resize = (out_height, out_width) != (height, width)
+
+    out = torch.empty((count, out_height, out_width, 3), dtype=torch.uint8)
+    for i in range(count):
+        frame = images[i, :, :, :3]
+        if resize:
+            frame = torch.nn.functional.interpolate(frame.permute(2, 0, 1)[None].float(), size=(out_height, out_width),
+                                                    mode="area")[0].permute(1, 2, 0)
+            frame = frame.mul_(255)
+        else:
+            frame = frame.mul(255)
+        # copy_ broadcasts grayscale to RGB and truncates to uint8
+        out[i].copy_(frame.clamp_(0, 255))
+    return out.numpy()
+
+
+def to_pil_images(images, max_side: Optional[int] = None) -> List[Image.Image]:
+    """PIL views of an IMAGE batch that share one uint8 buffer instead of copying each frame."""
+    array = to_uint8_batch(images, max_side)
+    height, width = array.shape[1:3]
+    return [Image.frombuffer("RGB", (width, height), frame, "raw", "RGB", 0, 1) for frame in array]
+
+
+def list_image_files(directory: str) -> List[str]:
+    """Sorted image file names directly inside `directory`."""
+    return sorted(name for name in os.listdir(directory)
+                  if name.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(os.path.join(directory, name)))
+
+
+def load_image_file(path: str, max_side: Optional[int] = None) -> Image.Image:
+    """Decode an image file as RGB, applying EXIF orientation and optional downscaling."""
+    with Image.open(path) as image:
+        if max_side:
+            # draft() lets JPEG decode at a reduced scale instead of decoding full size first
+            image.draft("RGB", (max_side, max_side))
+        image = ImageOps.exif_transpose(image).convert("RGB")
+    height, width = fit_size(image.height, image.width, max_side)
+    if (height, width) != (image.height, image.width):
+        image = image.resize((width, height), Image.BOX)
+    return image
+
+
+def prefetch(items: Iterable, load: Callable, workers: int = 2, depth: int = 4) -> Iterator[Tuple[object, object]]:
+    """Yield `(item, load(item))` in order while up to `depth` later items load on a thread pool.
+
+    The queue is bounded, so memory stays at `depth` decoded images however many
+    items there are. Exceptions from `load` are re-raised when their item is reached.
+    """
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending = deque()
+        for item in items:
+            pending.append((item, pool.submit(load, item)))
+            if len(pending) >= max(1, depth):
+                break
+        while pending:
+            item, future = pending.popleft()
+            following = next(items, _END)
+            if following is not _END:
+                pending.append((following, pool.submit(load, following)))
+            yield item, future.result()
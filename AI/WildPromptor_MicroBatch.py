@@ -0,0 +1,129 @@
+import time
+import threading
+from collections import deque, OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+from WildPromptor_ModelRegistry import get_ai_config
+
+DEFAULT_MAX_BATCH_SIZE = 16
+DEFAULT_MAX_WAIT_MS = 10
+# Batchers kept per process; the least recently used one is dropped beyond this
+MAX_BATCHERS = 32
+
+
+class _Request:
+    __slots__ = ("item", "result", "error", "done")
+
+    def __init__(self, item):
+        self.item = item
+        self.result = None
+        self.error = None
+        self.done = False
+
+
+class MicroBatcher:
+    """Coalesce generation requests for one model into padded batches.
+
+    Callers block in `submit(items, run_batch)`. Whoever finds no batch running
+    becomes the leader: it waits up to `max_wait_ms` for the queue to reach
+    `max_batch_size`, runs its own `run_batch` on up to that many queued items
+    (its own and other callers'), hands each result back to its request, and
+    repeats until its own items are done. There is no worker thread; an idle
+    batcher costs nothing, and it keeps no reference to any caller's function.
+
+    Items carry whatever differs between callers (e.g. a seed); everything
+    else must be covered by the batcher's key, so any caller's `run_batch`
+    gives the same results. `run_batch(items)` must return one result per item,
+    in order. If it raises, every caller with an item in that batch gets the
+    exception.
+    """
+
+    def __init__(self, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, max_wait_ms: float = DEFAULT_MAX_WAIT_MS):
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms / 1000.0)
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._running = False
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, items: List[Any], run_batch: Callable[[List[Any]], List[Any]],
+               sort_key: Optional[Callable[[Any], Any]] = None) -> List[Any]:
+        """Results for `items`, in order. `sort_key` queues them e.g. by length, so a
+        long list splits into batches of similar items instead of arrival order."""
+        requests = [_Request(item) for item in items]
+        queued = sorted(requests, key=lambda r: sort_key(r.item)) if sort_key else requests
+        with self._cond:
+            self._pending.extend(queued)
+            self._cond.notify_all()
+
+        while True:
+            with self._cond:
+                while self._running and not all(r.done for r in requests):
+                    self._cond.wait()
+                if all(r.done for r in requests):
+                    break
+                self._running = True
+
+                deadline = time.monotonic() + self.max_wait
+                while len(self._pending) < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = [self._pending.popleft() for _ in range(min(len(self._pending), self.max_batch_size))]
+
+            try:
+                results = run_batch([r.item for r in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"Batch returned {len(results)} results for {len(batch)} items")
+                for request, result in zip(batch, results):
+                    request.result = result
+            except Exception as e:
+                for request in batch:
+                    request.error = e
+            finally:
+                with self._cond:
+                    for request in batch:
+                        request.done = True
+                    self._running = False
+                    self.batches += 1
+                    self.items += len(batch)
+                    self._cond.notify_all()
+
+        for request in requests:
+            if request.error is not None:
+                raise request.error
+        return [r.result for r in requests]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+                "pending": len(self._pending),
+            }
+
+
+_batchers = OrderedDict()
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(key: Hashable) -> MicroBatcher:
+    """Shared batcher for `key`, which must cover the model and every setting items don't carry.
+
+    At most MAX_BATCHERS are kept, in LRU order. Callers already inside a dropped
+    batcher finish normally; later callers get a new one.
+    """
+    with _batchers_lock:
+        batcher = _batchers.get(key)
+        if batcher is None:
+            settings = get_ai_config().get("micro_batch", {})
+            batcher = MicroBatcher(settings.get("max_batch_size", DEFAULT_MAX_BATCH_SIZE),
+                                   settings.get("max_wait_ms", DEFAULT_MAX_WAIT_MS))
+            _batchers[key] = batcher
+            while len(_batchers) > MAX_BATCHERS:
+                _batchers.popitem(last=False)
+        else:
+            _batchers.move_to_end(key)
+        return batcher
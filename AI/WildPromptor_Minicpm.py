@@ -1,10 +1,25 @@
 import os
-import torch
-from transformers import AutoTokenizer, AutoModel
-from torchvision.transforms import ToPILImage
+import json
 from PIL import Image
 import folder_paths
 from typing import List
+from WildPromptor_LazyImport import lazy_import
+from WildPromptor_ModelRegistry import get_registry, get_ai_config
+from WildPromptor_ResultCache import get_result_cache, make_key, image_hash, model_revision
+from WildPromptor_ImageOps import to_pil_images, list_image_files, load_image_file, prefetch
+from WildPromptor_Streaming import INTERRUPT_EXCEPTIONS, InterruptCriteria, TextPusher, check_interrupted
+
+torch = lazy_import("torch")
+transformers = lazy_import("transformers")
+huggingface_hub = lazy_import("huggingface_hub")
+
+try:
+    import comfy.utils as comfy_utils
+except ImportError:
+    comfy_utils = None
+
+# Per-directory record of finished captions, appended one JSON line per image
+PROGRESS_FILE = ".wildpromptor_captions.jsonl"
 
 class WildPromptor_Minicpm:
     RETURN_TYPES = ("STRING",)
@@ -23,6 +38,10 @@ class WildPromptor_Minicpm:
             },
             "optional": {
                 "image": ("IMAGE",),
+                "stream": ("BOOLEAN", {"default": False, "tooltip": "Show text in connected Show Prompt nodes as it is generated"}),
+            },
+            "hidden": {
+                "unique_id": "UNIQUE_ID",
             },
         }
 
@@ -30,6 +49,8 @@ class WildPromptor_Minicpm:
         self.device = "cpu"
         self.bf16_support = False
         self.use_cuda = False
+        # Downscale images so the longest side fits before conversion (0 = keep full resolution)
+        self.image_max_side = get_ai_config().get("minicpm_image_max_side", 0)
         
         try:
             if torch.cuda.is_available():
@@ -38,21 +59,9 @@ class WildPromptor_Minicpm:
                 self.bf16_support = torch.cuda.get_device_capability(self.device)[0] >= 8
         except Exception as e:
             print(f"WildPromptor_minicpm CUDA init warning: {str(e)}")
-            
-        self.tokenizer = None
-        self.model = None
-
-    def process_image(self, image_tensor):
-        if image_tensor.dim() == 4:
-            if image_tensor.shape[-1] == 3:
-                image_tensor = image_tensor.permute(0, 3, 1, 2)
-            return [ToPILImage()(img) for img in image_tensor]
-        elif image_tensor.dim() == 3:
-            if image_tensor.shape[-1] == 3:
-                image_tensor = image_tensor.permute(2, 0, 1)
-            return [ToPILImage()(image_tensor)]
-        else:
-            raise ValueError(f"Unsupported image tensor shape: {image_tensor.shape}")
+
+    def process_image(self, image_tensor, max_side=None):
+        return to_pil_images(image_tensor, max_side)
 
     def get_language_prompt(self, language, text):
         language_prompts = {
@@ -64,50 +73,68 @@ class WildPromptor_Minicpm:
         }
         return language_prompts.get(language, "") + text
 
-    def inference(self, text, model, language, temperature, seed, image=None):
+    def load_model(self, model_id):
+        model_path = self.model_path(model_id)
+        print(f"Loading model: {model_id}")
+
+        if not os.path.exists(model_path):
+            print(f"Downloading model to: {model_path}")
+            huggingface_hub.snapshot_download(repo_id=model_id, local_dir=model_path, local_dir_use_symlinks=False)
+
+        tokenizer = transformers.AutoTokenizer.from_pretrained(model_path, trust_remote_code=True)
+        model_kwargs = {
+            "trust_remote_code": True,
+            "attn_implementation": "sdpa"
+        }
+
+        if self.use_cuda:
+            model_kwargs["dtype"] = torch.bfloat16 if self.bf16_support else torch.float16
+
+        model = transformers.AutoModel.from_pretrained(model_path, **model_kwargs)
+        
+        if self.use_cuda:
+            model = model.to(self.device)
+        
+        model.eval()
+        return {"model": model, "tokenizer": tokenizer}
+
+    def runtime(self):
+        """Device and dtype the model runs with; results from different ones are cached apart."""
+        if not self.use_cuda:
+            return "cpu/float32"
+        return f"{self.device}/{'bfloat16' if self.bf16_support else 'float16'}"
+
+    def model_path(self, model_id):
+        return os.path.join(folder_paths.models_dir, "LLM", os.path.basename(model_id))
+
+    def inference(self, text, model, language, temperature, seed, image=None, stream=False, unique_id=None):
+        current_model_id = f"openbmb/{model}"
+        # Seed 0 samples from an unseeded generator, so only fixed seeds are reproducible
+        cache = get_result_cache() if seed > 0 else None
+        if cache:
+            try:
+                cache_key = make_key(node="WildPromptor_Minicpm", model=current_model_id,
+                                     revision=model_revision(self.model_path(current_model_id)), text=text,
+                                     language=language, temperature=temperature, seed=seed, image=image_hash(image),
+                                     image_max_side=self.image_max_side, runtime=self.runtime())
+            except Exception as e:
+                print(f"WildPromptor_minicpm result cache skipped: {str(e)}")
+                cache = None
+        if cache:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return (cached,)
+
         if seed > 0:
             torch.manual_seed(seed)
 
         try:
-            current_model_id = f"openbmb/{model}"
-            model_path = os.path.join(folder_paths.models_dir, "LLM", os.path.basename(current_model_id))
-
-            if self.model is None or not hasattr(self, 'loaded_model_name') or self.loaded_model_name != current_model_id:
-                if self.model is not None:
-                    del self.model
-                    del self.tokenizer
-                    if self.use_cuda:
-                        torch.cuda.empty_cache()
-                
-                print(f"Loading model: {current_model_id}")
-                
-                if not os.path.exists(model_path):
-                    from huggingface_hub import snapshot_download
-                    print(f"Downloading model to: {model_path}")
-                    snapshot_download(repo_id=current_model_id, local_dir=model_path, local_dir_use_symlinks=False)
-
-                self.tokenizer = AutoTokenizer.from_pretrained(model_path, trust_remote_code=True)
-                model_kwargs = {
-                    "trust_remote_code": True,
-                    "attn_implementation": "sdpa"
-                }
 
-                if self.use_cuda:
-                    model_kwargs["dtype"] = torch.bfloat16 if self.bf16_support else torch.float16
-
-                self.model = AutoModel.from_pretrained(model_path, **model_kwargs)
-                
-                if self.use_cuda:
-                    self.model = self.model.to(self.device)
-                
-                self.model.eval()
-                self.loaded_model_name = current_model_id
-            
-            with torch.no_grad():
+            with get_registry().use(f"minicpm:{current_model_id}", lambda: self.load_model(current_model_id)) as bundle, torch.no_grad():
                 if image is not None:
                     try:
                         if isinstance(image, torch.Tensor):
-                            images = self.process_image(image)
+                            images = self.process_image(image, self.image_max_side)
                             content_list = images + [self.get_language_prompt(language, text)]
                             msgs = [{"role": "user", "content": content_list}]
                         else:
@@ -117,27 +144,177 @@ class WildPromptor_Minicpm:
                 else:
                     msgs = [{"role": "user", "content": [self.get_language_prompt(language, text)]}]
 
-                result = self.model.chat(
+                result = bundle["model"].chat(
                     image=None,
                     msgs=msgs,
-                    tokenizer=self.tokenizer,
+                    tokenizer=bundle["tokenizer"],
                     sampling=True,
                     temperature=temperature,
-                    max_new_tokens=2048
+                    max_new_tokens=2048,
+                    stream=stream,
+                    stopping_criteria=transformers.StoppingCriteriaList([InterruptCriteria()])
                 )
 
+                if stream:
+                    # chat(stream=True) yields text chunks from a generation thread
+                    pusher = TextPusher(unique_id)
+                    chunks = []
+                    for chunk in result:
+                        chunks.append(chunk)
+                        pusher.update("".join(chunks))
+                    result = "".join(chunks)
+                    pusher.finish(result)
+                check_interrupted()
+
                 if self.use_cuda:
                     torch.cuda.empty_cache()
 
+                if cache:
+                    cache.put(cache_key, result)
                 return (result,)
 
+        except INTERRUPT_EXCEPTIONS:
+            raise
         except Exception as e:
             return (f"Error: {str(e)}",)
 
+class WildPromptor_MinicpmCaption(WildPromptor_Minicpm):
+    """One caption per image for an IMAGE batch or every image in a directory.
+
+    Images are decoded on a thread pool through a bounded prefetch queue while
+    the model captions the current one. Directory runs append each caption to
+    .wildpromptor_captions.jsonl in that directory (and optionally a .txt
+    sidecar), so a rerun with the same settings skips finished images. Batch
+    runs with a fixed seed resume through the result cache.
+    """
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("captions",)
+    OUTPUT_IS_LIST = (True,)
+    FUNCTION = "caption"
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        inputs = super().INPUT_TYPES()
+        inputs["optional"] = {
+            "image": ("IMAGE",),
+            "directory": ("STRING", {"default": "", "tooltip": "Caption every image in this folder instead of the image input"}),
+            "write_sidecars": ("BOOLEAN", {"default": False, "tooltip": "Write each caption to a .txt file next to its image (directory mode)"}),
+            "overwrite": ("BOOLEAN", {"default": False, "tooltip": "Recaption images that already have a caption from an earlier run"}),
+        }
+        inputs.pop("hidden", None)
+        return inputs
+
+    def caption_image(self, bundle, pil_image, prompt, temperature, seed):
+        # Reseed per image so a caption doesn't depend on its position in the run
+        if seed > 0:
+            torch.manual_seed(seed)
+        return bundle["model"].chat(
+            image=None,
+            msgs=[{"role": "user", "content": [pil_image, prompt]}],
+            tokenizer=bundle["tokenizer"],
+            sampling=True,
+            temperature=temperature,
+            max_new_tokens=2048,
+            stopping_criteria=transformers.StoppingCriteriaList([InterruptCriteria()])
+        )
+
+    def load_progress(self, directory, settings):
+        progress = {}
+        try:
+            with open(os.path.join(directory, PROGRESS_FILE), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by a crash
+                    if entry.get("settings") == settings:
+                        progress[entry["file"]] = entry
+        except FileNotFoundError:
+            pass
+        return progress
+
+    def append_progress(self, directory, entry):
+        with open(os.path.join(directory, PROGRESS_FILE), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def write_sidecar(self, image_path, caption):
+        sidecar = os.path.splitext(image_path)[0] + ".txt"
+        temp_path = sidecar + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(caption)
+        os.replace(temp_path, sidecar)
+
+    def caption(self, text, model, language, temperature, seed, image=None, directory="", write_sidecars=False, overwrite=False):
+        current_model_id = f"openbmb/{model}"
+        prompt = self.get_language_prompt(language, text)
+        config = get_ai_config().get("caption", {})
+        workers, depth = config.get("prefetch_workers", 2), config.get("prefetch_depth", 4)
+        directory = directory.strip()
+
+        settings = make_key(model=current_model_id, revision=model_revision(self.model_path(current_model_id)),
+                            text=text, language=language, temperature=temperature, seed=seed,
+                            image_max_side=self.image_max_side, runtime=self.runtime())
+        if directory:
+            if not os.path.isdir(directory):
+                raise ValueError(f"Directory not found: {directory}")
+            names = list_image_files(directory)
+            progress = {} if overwrite else self.load_progress(directory, settings)
+            captions = [None] * len(names)
+            todo = []
+            for i, name in enumerate(names):
+                stat = os.stat(os.path.join(directory, name))
+                entry = progress.get(name)
+                if entry and entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+                    captions[i] = entry["caption"]
+                else:
+                    todo.append(i)
+            load = lambda i: load_image_file(os.path.join(directory, names[i]), self.image_max_side)
+        elif image is not None:
+            # Fixed seeds are reproducible, so finished frames come back from the result cache
+            cache = get_result_cache() if seed > 0 else None
+            keys = [make_key(node="WildPromptor_MinicpmCaption", settings=settings, image=image_hash(image[i:i + 1]))
+                    for i in range(image.shape[0])] if cache else []
+            captions = [cache.get(key) for key in keys] if cache and not overwrite else [None] * image.shape[0]
+            todo = [i for i, caption in enumerate(captions) if caption is None]
+            load = lambda i: to_pil_images(image[i:i + 1], self.image_max_side)[0]
+        else:
+            raise ValueError("Connect an image batch or set a directory to caption")
+
+        print(f"[MiniCPM caption] {len(captions) - len(todo)} of {len(captions)} images already captioned")
+        progress_bar = comfy_utils.ProgressBar(len(todo)) if comfy_utils and todo else None
+
+        if todo:
+            with get_registry().use(f"minicpm:{current_model_id}", lambda: self.load_model(current_model_id)) as bundle, torch.no_grad():
+                for i, pil_image in prefetch(todo, load, workers, depth):
+                    caption = self.caption_image(bundle, pil_image, prompt, temperature, seed)
+                    check_interrupted()
+                    captions[i] = caption
+                    if directory:
+                        image_path = os.path.join(directory, names[i])
+                        if write_sidecars:
+                            self.write_sidecar(image_path, caption)
+                        stat = os.stat(image_path)
+                        self.append_progress(directory, {"file": names[i], "mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                                                         "settings": settings, "caption": caption})
+                    elif cache:
+                        cache.put(keys[i], caption)
+                    if progress_bar:
+                        progress_bar.update(1)
+
+            if self.use_cuda:
+                torch.cuda.empty_cache()
+
+        return (captions,)
+
 NODE_CLASS_MAPPINGS = {
-    "WildPromptor_Minicpm": WildPromptor_Minicpm
+    "WildPromptor_Minicpm": WildPromptor_Minicpm,
+    "WildPromptor_MinicpmCaption": WildPromptor_MinicpmCaption
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
-    "WildPromptor_Minicpm": "MiniCPM 🤖👁️(WildPromptor)"
+    "WildPromptor_Minicpm": "MiniCPM 🤖👁️(WildPromptor)",
+    "WildPromptor_MinicpmCaption": "MiniCPM Batch Caption 🤖👁️(WildPromptor)"
 }
\ No newline at end of file
@@ -0,0 +1,194 @@
+import os
+import gc
+import sys
+import json
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config_ai.json')
+DEFAULT_MAX_MEMORY_MB = 8192
+
+
+def estimate_bytes(bundle: Dict[str, Any]) -> int:
+    """Sum parameter and buffer sizes of every torch module in a model bundle."""
+    total = 0
+    seen = set()
+    for value in bundle.values():
+        model = getattr(value, "model", value)  # transformers pipelines wrap the model
+        if id(model) in seen:
+            continue
+        seen.add(id(model))
+        if hasattr(model, "parameters"):
+            total += sum(p.numel() * p.element_size() for p in model.parameters())
+        if hasattr(model, "buffers"):
+            total += sum(b.numel() * b.element_size() for b in model.buffers())
+    return total
+
+
+class ModelEntry:
+    __slots__ = ("bundle", "nbytes", "refs", "load_seconds")
+
+    def __init__(self, bundle, nbytes, load_seconds):
+        self.bundle = bundle
+        self.nbytes = nbytes
+        self.refs = 0
+        self.load_seconds = load_seconds
+
+
+class ModelRegistry:
+    """Shared residency manager for the AI nodes' models.
+
+    Models are loaded through `use(key, loader)`, a context manager that holds a
+    reference while a generation runs. Resident models are kept in LRU order and
+    the least recently used idle ones are evicted once their estimated size
+    exceeds `max_memory_mb`. Models in use are never evicted, so the budget can
+    be exceeded temporarily when several large models run at once.
+    """
+
+    def __init__(self, max_memory_mb: float = DEFAULT_MAX_MEMORY_MB):
+        self.max_bytes = int(max_memory_mb * 1024 * 1024)
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._load_locks = {}
+        self.memory_bytes = 0
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+        self.evict_seconds = 0.0
+
+    @contextmanager
+    def use(self, key: str, loader: Callable[[], Dict[str, Any]]):
+        """Yield the bundle for `key`, loading it with `loader()` if it isn't resident."""
+        entry = self._acquire(key, loader)
+        try:
+            yield entry.bundle
+        finally:
+            with self._lock:
+                entry.refs -= 1
+                self._evict()
+
+    def _acquire(self, key, loader):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.refs += 1
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Load outside the registry lock so other models stay usable; one loader per key
+        if load_lock.locked():
+            print(f"[ModelRegistry] Waiting for {key} to finish loading (background preload or another run)")
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refs += 1
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+
+            start_time = time.perf_counter()
+            bundle = loader()
+            load_seconds = time.perf_counter() - start_time
+            entry = ModelEntry(bundle, estimate_bytes(bundle), load_seconds)
+            print(f"[ModelRegistry] Loaded {key} in {load_seconds:.2f}s ({entry.nbytes / (1024 * 1024):.0f} MB)")
+
+            with self._lock:
+                entry.refs += 1
+                self._entries[key] = entry
+                self.memory_bytes += entry.nbytes
+                self.loads += 1
+                self.load_seconds += load_seconds
+                self._evict()
+                return entry
+
+    def _evict(self):
+        for key in list(self._entries):
+            if self.memory_bytes <= self.max_bytes:
+                break
+            entry = self._entries[key]
+            if entry.refs > 0:
+                continue
+            self._drop(key)
+
+    def _drop(self, key):
+        start_time = time.perf_counter()
+        entry = self._entries.pop(key)
+        self.memory_bytes -= entry.nbytes
+        entry.bundle = None
+        gc.collect()
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        seconds = time.perf_counter() - start_time
+        self.evictions += 1
+        self.evict_seconds += seconds
+        print(f"[ModelRegistry] Evicted {key} in {seconds:.2f}s")
+
+    def unload(self, key: str = None):
+        """Drop one idle model, or every idle model when no key is given."""
+        with self._lock:
+            keys = [key] if key is not None else list(self._entries)
+            for k in keys:
+                entry = self._entries.get(k)
+                if entry is not None and entry.refs == 0:
+                    self._drop(k)
+
+    def is_loaded(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "models": {k: {"memory_mb": round(e.nbytes / (1024 * 1024), 1), "in_use": e.refs,
+                               "load_seconds": round(e.load_seconds, 2)} for k, e in self._entries.items()},
+                "memory_mb": round(self.memory_bytes / (1024 * 1024), 1),
+                "max_memory_mb": round(self.max_bytes / (1024 * 1024), 1),
+                "hits": self.hits,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "load_seconds": round(self.load_seconds, 2),
+                "evict_seconds": round(self.evict_seconds, 2),
+            }
+
+
+def load_ai_config() -> Dict[str, Any]:
+    try:
+        with open(CONFIG_PATH, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading config {CONFIG_PATH}: {e}")
+        return {}
+
+
+_ai_config = None
+
+
+def get_ai_config() -> Dict[str, Any]:
+    """config_ai.json, read once per process."""
+    global _ai_config
+    if _ai_config is None:
+        _ai_config = load_ai_config()
+    return _ai_config
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ModelRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                config = get_ai_config()
+                max_memory_mb = config.get("model_registry", {}).get("max_memory_mb", DEFAULT_MAX_MEMORY_MB)
+                _registry = ModelRegistry(max_memory_mb)
+    return _registry
@@ -0,0 +1,217 @@
+import io
+import json
+import asyncio
+import time
+import base64
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from WildPromptorAI import WildPromptorAI
+from WildPromptor_ModelRegistry import get_ai_config
+from WildPromptor_Streaming import INTERRUPT_EXCEPTIONS, TextPusher, check_interrupted, is_interrupted
+
+DEFAULT_URL = "http://127.0.0.1:11434"
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MODEL_LIST_TTL = 60
+
+_session = None
+_executor = None
+_model_lists = {}
+_shared_lock = threading.Lock()
+
+
+def ollama_config() -> Dict:
+    return get_ai_config().get("ollama", {})
+
+
+def get_session() -> requests.Session:
+    """One Session for every Ollama call, so connections are pooled and kept alive."""
+    global _session
+    with _shared_lock:
+        if _session is None:
+            workers = ollama_config().get("max_workers", DEFAULT_MAX_WORKERS)
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(workers, 4))
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Bounded pool that runs the prompts of one list concurrently."""
+    global _executor
+    with _shared_lock:
+        if _executor is None:
+            workers = ollama_config().get("max_workers", DEFAULT_MAX_WORKERS)
+            _executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="WildPromptor-ollama")
+        return _executor
+
+
+def normalize_url(url: Optional[str]) -> str:
+    url = (url or "").strip() or ollama_config().get("url", DEFAULT_URL)
+    return url.rstrip("/")
+
+
+def list_models(url: Optional[str] = None, refresh: bool = False) -> List[str]:
+    """Model names installed on an Ollama server, cached for "model_list_ttl" seconds."""
+    url = normalize_url(url)
+    config = ollama_config()
+    ttl = config.get("model_list_ttl", DEFAULT_MODEL_LIST_TTL)
+    with _shared_lock:
+        cached = _model_lists.get(url)
+    if cached and not refresh and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+
+    response = get_session().get(f"{url}/api/tags", timeout=config.get("connection_timeout", 30))
+    response.raise_for_status()
+    models = sorted(m["name"] for m in response.json().get("models", []))
+    with _shared_lock:
+        _model_lists[url] = (time.monotonic(), models)
+    return models
+
+
+def image_to_base64(image) -> str:
+    buffer = io.BytesIO()
+    # Lossless, with the fastest zlib level: encoding speed matters more than upload size on a local server
+    WildPromptorAI.tensor_to_image(image).save(buffer, format="PNG", compress_level=1)
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def generate(url: str, payload: Dict, on_text: Optional[Callable[[str], None]] = None) -> str:
+    """Stream one /api/generate call and return the full response text.
+
+    The body is read to the end so the connection goes back to the pool.
+    Closing the response early on interrupt drops the connection instead, which
+    makes Ollama stop generating.
+    """
+    config = ollama_config()
+    payload = dict(payload, stream=True)
+    chunks = []
+    with get_session().post(f"{url}/api/generate", json=payload, stream=True,
+                            timeout=config.get("connection_timeout", 30)) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if is_interrupted():
+                break
+            if not line:
+                continue
+            message = json.loads(line)
+            if message.get("error"):
+                raise RuntimeError(message["error"])
+            chunks.append(message.get("response", ""))
+            if on_text is not None:
+                on_text("".join(chunks))
+    return "".join(chunks)
+
+
+class WildPromptorOllamaVision(WildPromptorAI):
+    @classmethod
+    def INPUT_TYPES(cls):
+        config = ollama_config()
+        return {
+            "required": {
+                "keywords": ("STRING", {"multiline": True}),
+                "server_url": ("STRING", {"default": config.get("url", DEFAULT_URL)}),
+                # The frontend replaces these choices with the server's installed models
+                "model": ([config.get("model", "")],),
+                "max_length": ("INT", {"default": 512, "min": 1, "max": 8192, "tooltip": "Maximum tokens to generate"}),
+                "temperature": ("FLOAT", {"default": 0.7, "min": 0.0, "max": 2.0, "step": 0.1}),
+                "seed": ("INT", {"default": 0, "min": 0, "max": 0xffffffff, "tooltip": "0 lets Ollama pick a random seed"}),
+            },
+            "optional": {
+                "image": ("IMAGE",),
+                "stream": ("BOOLEAN", {"default": False, "tooltip": "Show text in connected Show Prompt nodes as it is generated (single prompts)"}),
+            },
+            "hidden": {
+                "unique_id": "UNIQUE_ID",
+            },
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("prompt",)
+    INPUT_IS_LIST = True
+    OUTPUT_IS_LIST = (True,)
+    FUNCTION = "generate_prompt"
+    CATEGORY = "🧪AILab/🤖AI"
+
+    @classmethod
+    def VALIDATE_INPUTS(cls, model):
+        # Model choices come from the server at runtime, not from INPUT_TYPES
+        return True
+
+    def build_payload(self, keywords, model, image, max_length, temperature, seed):
+        config = self.config.get("ollama", {})
+        options = {"num_predict": max_length, "temperature": temperature}
+        if seed:
+            options["seed"] = seed
+        payload = {
+            "model": model,
+            "keep_alive": f"{config.get('keep_alive_interval', 5)}m",
+            "options": options,
+        }
+        if image is not None:
+            payload["prompt"] = self.format_image_prompt(keywords)
+            payload["images"] = [image_to_base64(frame) for frame in image]
+        else:
+            payload["prompt"] = self.format_prompt(keywords)
+        return payload
+
+    def run_one(self, url, payload, pusher=None):
+        try:
+            text = generate(url, payload, pusher.update if pusher else None)
+        except INTERRUPT_EXCEPTIONS:
+            raise
+        except Exception as e:
+            print(f"[Ollama] Generation failed: {str(e)}")
+            return f"Error: {str(e)}"
+        if pusher:
+            pusher.finish(text)
+        return self.clean_prompt(text)
+
+    def generate_prompt(self, keywords, server_url, model, max_length, temperature, seed,
+                        image=None, stream=(False,), unique_id=(None,)):
+        # INPUT_IS_LIST: keywords (and image) may hold many entries, the widgets hold one value each
+        url, model, max_length = normalize_url(server_url[0]), model[0], max_length[0]
+        temperature, seed, stream, unique_id = temperature[0], seed[0], stream[0], unique_id[0]
+        images = image or [None]
+
+        payloads = [self.build_payload(k, model, images[min(i, len(images) - 1)], max_length, temperature, seed)
+                    for i, k in enumerate(keywords)]
+        if len(payloads) == 1:
+            results = [self.run_one(url, payloads[0], TextPusher(unique_id) if stream else None)]
+        else:
+            results = list(get_executor().map(lambda payload: self.run_one(url, payload), payloads))
+        check_interrupted()
+
+        for result in results:
+            print(f"[Ollama prompt]:\n{result}")
+        return (results,)
+
+
+try:
+    from server import PromptServer
+    from aiohttp import web
+except ImportError:
+    PromptServer = None
+
+if PromptServer is not None and getattr(PromptServer, "instance", None) is not None:
+    @PromptServer.instance.routes.post("/ollama/get_models")
+    async def get_ollama_models(request):
+        try:
+            data = await request.json()
+        except Exception:
+            data = {}
+        try:
+            # Blocking HTTP call; keep it off the server's event loop
+            models = await asyncio.get_running_loop().run_in_executor(None, list_models, data.get("url"))
+        except Exception as e:
+            print(f"[Ollama] Could not list models: {str(e)}")
+            models = []
+        return web.json_response(models)
+
+
+NODE_CLASS_MAPPINGS = {"WildPromptorOllamaVision": WildPromptorOllamaVision}
+NODE_DISPLAY_NAME_MAPPINGS = {"WildPromptorOllamaVision": "Ollama 🤖👁️(WildPromptor)"}
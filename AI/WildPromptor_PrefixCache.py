@@ -0,0 +1,62 @@
+import copy
+from typing import List, Optional
+from WildPromptor_LazyImport import lazy_import
+
+torch = lazy_import("torch")
+
+
+class PrefixCache:
+    """Keys/values of a fixed prompt prefix, computed once per causal LM and reused.
+
+    Every prompt built from the same template starts with the same tokens, so the
+    prefix is run through the model once and its past_key_values are copied into
+    each batch; `generate` then only encodes the part after the prefix.
+    """
+
+    def __init__(self, model, tokenizer, prefix: str):
+        self.prefix_ids = tokenizer(prefix)["input_ids"]
+        with torch.no_grad():
+            prefix_tensor = torch.tensor([self.prefix_ids], device=model.device)
+            self.past_key_values = model(prefix_tensor, use_cache=True).past_key_values
+
+    def split(self, tokenizer, prompts: List[str]) -> Optional[List[List[int]]]:
+        """Token ids after the prefix for each prompt.
+
+        Returns None unless every prompt tokenizes to exactly the cached prefix
+        tokens followed by at least one more, so a merge across the boundary
+        never changes what the model sees.
+        """
+        encoded = tokenizer(prompts)["input_ids"]
+        prefix_len = len(self.prefix_ids)
+        if any(ids[:prefix_len] != self.prefix_ids or len(ids) == prefix_len for ids in encoded):
+            return None
+        return [ids[prefix_len:] for ids in encoded]
+
+    def build_inputs(self, suffixes: List[List[int]], pad_token_id: int, device):
+        """`generate` kwargs for prefix + padding + suffix rows and a batch-sized copy of the cache.
+
+        Padding goes between the prefix and the suffix rather than on the left, so
+        the cached prefix sits at the same positions in every row; the attention
+        mask hides the padding and position ids are derived from it.
+        """
+        width = max(len(suffix) for suffix in suffixes)
+        prefix_len = len(self.prefix_ids)
+        rows, masks = [], []
+        for suffix in suffixes:
+            padding = width - len(suffix)
+            rows.append(self.prefix_ids + [pad_token_id] * padding + suffix)
+            masks.append([1] * prefix_len + [0] * padding + [1] * len(suffix))
+        return {
+            "input_ids": torch.tensor(rows, device=device),
+            "attention_mask": torch.tensor(masks, device=device),
+            "past_key_values": self.expand(len(suffixes)),
+        }
+
+    def expand(self, batch_size: int):
+        past = self.past_key_values
+        if hasattr(past, "batch_repeat_interleave"):
+            # Cache objects are extended in place by generate, so each batch gets its own copy
+            past = copy.deepcopy(past)
+            past.batch_repeat_interleave(batch_size)
+            return past
+        return tuple(tuple(t.repeat(batch_size, *[1] * (t.dim() - 1)) for t in layer) for layer in past)
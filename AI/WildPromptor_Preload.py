@@ -0,0 +1,121 @@
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+from WildPromptor_ModelRegistry import get_registry, get_ai_config
+
+WARMUP_TEXT = "a lighthouse on a rocky coast"
+WARMUP_NEW_TOKENS = 8
+
+_status = {}
+_status_lock = threading.Lock()
+_thread = None
+
+
+def _enhancer_job(spec) -> Tuple[str, Callable, Callable]:
+    from WildPromptor_Enhancer import WildPromptor_Enhancer
+    node = WildPromptor_Enhancer()
+    warmup = lambda: node.run_batch([(WARMUP_TEXT, 0)], 1, max_new_tokens=WARMUP_NEW_TOKENS)
+    return f"enhancer:{node.model_checkpoint}", node.load_model, warmup
+
+
+def _hfgpt_job(spec) -> Tuple[str, Callable, Callable]:
+    from WildPromptor_HFgpt import WildPromptor_HFgpt
+    node = WildPromptor_HFgpt()
+    model_repo = spec["model"]
+    # Also builds the template prefix cache when "prefix_cache" is on. The templated prompt alone is longer than a
+    # small max_length, which generate rejects, so the warmup bounds new tokens instead.
+    warmup = lambda: node.generate_batch([node.format_prompt(WARMUP_TEXT)], model_repo, 0.7, None,
+                                         max_new_tokens=WARMUP_NEW_TOKENS)
+    return f"hfgpt:{model_repo}", lambda: node.load_model(model_repo), warmup
+
+
+def _minicpm_job(spec) -> Tuple[str, Callable, Callable]:
+    from WildPromptor_Minicpm import WildPromptor_Minicpm
+    node = WildPromptor_Minicpm()
+    model_id = f"openbmb/{spec['model']}"
+    key = f"minicpm:{model_id}"
+
+    def warmup():
+        with get_registry().use(key, lambda: node.load_model(model_id)) as bundle:
+            bundle["model"].chat(image=None, msgs=[{"role": "user", "content": [WARMUP_TEXT]}],
+                                 tokenizer=bundle["tokenizer"], sampling=False, max_new_tokens=WARMUP_NEW_TOKENS)
+    return key, lambda: node.load_model(model_id), warmup
+
+
+JOBS = {
+    "enhancer": _enhancer_job,
+    "hfgpt": _hfgpt_job,
+    "minicpm": _minicpm_job,
+}
+
+
+def _set_status(key, state):
+    with _status_lock:
+        _status[key] = state
+
+
+def preload_status() -> Dict[str, str]:
+    """Registry key -> "pending", "loading", "warming", "ready" or "error: ...", served by GET /wildpromptor/preload."""
+    with _status_lock:
+        return dict(_status)
+
+
+def _run(specs, warmup_enabled):
+    registry = get_registry()
+    for label, job in specs:
+        key = label
+        try:
+            key, loader, warmup = job()
+            if key != label:
+                with _status_lock:
+                    _status[key] = _status.pop(label, "pending")
+            _set_status(key, "loading")
+            with registry.use(key, loader):
+                if warmup_enabled:
+                    _set_status(key, "warming")
+                    warmup()
+            _set_status(key, "ready")
+            print(f"[Preload] {key} ready")
+        except Exception as e:
+            _set_status(key, f"error: {e}")
+            print(f"[Preload] {key} failed: {e}")
+
+
+def start_preload(config: Optional[Dict[str, Any]] = None):
+    """Load (and warm up) the models in config_ai.json "preload" on a background thread.
+
+    Models load one after another into the shared registry, so a node that runs
+    early waits on the registry's per-model load lock instead of loading twice.
+    """
+    global _thread
+    settings = (config if config is not None else get_ai_config()).get("preload", {})
+    if not settings.get("enabled") or _thread is not None:
+        return
+
+    specs = []
+    for spec in settings.get("models", []):
+        make_job = JOBS.get(spec.get("node"))
+        if make_job is None:
+            print(f"[Preload] Unknown node in preload list: {spec}")
+            continue
+        label = f"{spec['node']}:{spec.get('model', '')}"
+        _set_status(label, "pending")
+        specs.append((label, lambda make_job=make_job, spec=spec: make_job(spec)))
+
+    if specs:
+        _thread = threading.Thread(target=_run, args=(specs, settings.get("warmup", True)),
+                                   name="WildPromptor-preload", daemon=True)
+        _thread.start()
+
+
+try:
+    from server import PromptServer
+    from aiohttp import web
+except ImportError:
+    PromptServer = None
+
+if PromptServer is not None and getattr(PromptServer, "instance", None) is not None:
+    @PromptServer.instance.routes.get("/wildpromptor/preload")
+    async def get_preload_status(request):
+        return web.json_response({"models": preload_status(), "registry": get_registry().stats()})
+
+    start_preload()
@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+from WildPromptor_ModelRegistry import get_ai_config
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PATH = os.path.join(BASE_PATH, "cache", "ai_results.sqlite3")
+DEFAULT_MAX_SIZE_MB = 256
+# Evict down to this fraction of the cap, so a full cache doesn't evict on every put
+EVICT_TARGET = 0.9
+
+
+def image_hash(image) -> Optional[str]:
+    """sha256 of an IMAGE tensor's shape, dtype and pixel bytes."""
+    if image is None:
+        return None
+    array = image.detach().cpu().contiguous().numpy()
+    digest = hashlib.sha256(f"{array.shape}|{array.dtype}|".encode())
+    digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def model_revision(model_path: str) -> Optional[int]:
+    """mtime of a local model snapshot's config.json, so a re-download invalidates old results."""
+    try:
+        return os.stat(os.path.join(model_path, "config.json")).st_mtime_ns
+    except OSError:
+        return None
+
+
+def make_key(**parts) -> str:
+    """Content address for a node call: sha256 of its canonical JSON description."""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Size-capped, LRU-evicted store of deterministic AI node outputs in SQLite.
+
+    SQLite's locking makes the file safe to share between ComfyUI processes.
+    Values are JSON. `last_access` is updated on every hit and the least recently
+    used rows are deleted once the stored values exceed `max_size_mb`.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, max_size_mb: float = DEFAULT_MAX_SIZE_MB):
+        self.path = path
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._conn = None
+        self.hits = 0
+        self.misses = 0
+        self.puts = 0
+        self.evictions = 0
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                         "size INTEGER NOT NULL, last_access REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Any:
+        """Cached value for `key`, or None."""
+        with self._lock:
+            try:
+                conn = self._connect()
+                row = conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+                self.hits += 1
+                return json.loads(row[0])
+            except (sqlite3.Error, ValueError) as e:
+                print(f"[ResultCache] Read failed: {e}")
+                self.misses += 1
+                return None
+
+    def put(self, key: str, value: Any):
+        data = json.dumps(value)
+        size = len(data.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.execute("INSERT OR REPLACE INTO results (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                                 (key, data, size, time.time()))
+                    self._evict(conn)
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                self.puts += 1
+            except sqlite3.Error as e:
+                print(f"[ResultCache] Write failed: {e}")
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * EVICT_TARGET
+        rows = conn.execute("SELECT key, size FROM results ORDER BY last_access").fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= target:
+                break
+            stale.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM results WHERE key = ?", stale)
+        self.evictions += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._connect().execute("DELETE FROM results")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            try:
+                entries, total = self._connect().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+            except sqlite3.Error:
+                entries, total = 0, 0
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "size_mb": round(total / (1024 * 1024), 2),
+                "max_size_mb": round(self.max_bytes / (1024 * 1024), 2),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "puts": self.puts,
+                "evictions": self.evictions,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Shared cache configured by config_ai.json "result_cache", or None when disabled."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                settings = get_ai_config().get("result_cache", {})
+                if not settings.get("enabled", True):
+                    _cache = False
+                else:
+                    _cache = ResultCache(settings.get("path") or DEFAULT_PATH,
+                                         settings.get("max_size_mb", DEFAULT_MAX_SIZE_MB))
+    return _cache or None
+
+
+try:
+    from server import PromptServer
+    from aiohttp import web
+except ImportError:
+    PromptServer = None
+
+if PromptServer is not None and getattr(PromptServer, "instance", None) is not None:
+    @PromptServer.instance.routes.get("/wildpromptor/result_cache")
+    async def get_result_cache_stats(request):
+        cache = get_result_cache()
+        return web.json_response(cache.stats() if cache else {"enabled": False})
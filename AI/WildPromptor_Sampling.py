@@ -0,0 +1,49 @@
+from typing import List
+from WildPromptor_LazyImport import lazy_import
+
+torch = lazy_import("torch")
+
+SEED_MODULUS = 1 << 64
+
+
+def item_seeds(seed: int, count: int) -> List[int]:
+    """Per-item seeds `seed, seed + 1, ...`, wrapped to the 64-bit range torch accepts."""
+    return [(seed + i) % SEED_MODULUS for i in range(count)]
+
+
+class SeededSampler:
+    """Logits processor that samples every batch row from its own torch.Generator.
+
+    `generate` draws from the global RNG, so a row's output would depend on what
+    else is in the batch. Run greedy decoding (`do_sample=False`) with this
+    processor instead: it applies temperature, top-k and top-p, samples one token
+    per row with that row's generator, and masks every other token, so the
+    greedy step picks the sampled token. Row i's output depends only on seeds[i].
+    """
+
+    def __init__(self, seeds: List[int], temperature: float = 1.0, top_k: int = 0, top_p: float = 1.0, device="cpu"):
+        self.generators = [torch.Generator(device=device).manual_seed(seed) for seed in seeds]
+        self.temperature = temperature
+        self.top_k = top_k
+        self.top_p = top_p
+
+    def __call__(self, input_ids, scores):
+        scores = scores.float() / max(self.temperature, 1e-5)
+        if self.top_k > 0:
+            top_k = min(self.top_k, scores.shape[-1])
+            kth_best = torch.topk(scores, top_k).values[..., -1, None]
+            scores = scores.masked_fill(scores < kth_best, float("-inf"))
+        if self.top_p < 1.0:
+            sorted_scores, sorted_indices = torch.sort(scores, descending=True)
+            cumulative = sorted_scores.softmax(dim=-1).cumsum(dim=-1)
+            remove = cumulative > self.top_p
+            # Shift right so the token that crosses top_p is kept, as is the best one
+            remove[..., 1:] = remove[..., :-1].clone()
+            remove[..., 0] = False
+            scores = scores.masked_fill(remove.scatter(1, sorted_indices, remove), float("-inf"))
+
+        probs = scores.softmax(dim=-1)
+        chosen = torch.cat([torch.multinomial(probs[row], 1, generator=generator)
+                            for row, generator in enumerate(self.generators)])
+        masked = torch.full_like(scores, float("-inf"))
+        return masked.scatter(1, chosen[:, None], 0.0)
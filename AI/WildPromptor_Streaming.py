@@ -0,0 +1,93 @@
+import time
+from WildPromptor_LazyImport import lazy_import
+
+torch = lazy_import("torch")
+
+try:
+    import comfy.model_management as model_management
+    INTERRUPT_EXCEPTIONS = (model_management.InterruptProcessingException,)
+except ImportError:
+    model_management = None
+    INTERRUPT_EXCEPTIONS = ()
+
+try:
+    from server import PromptServer
+except ImportError:
+    PromptServer = None
+
+STREAM_EVENT = "wildpromptor.stream"
+# Minimum seconds between partial-text messages to the frontend
+STREAM_INTERVAL = 0.1
+
+
+def send_text(node_id, text, done=False):
+    """Push a node's partial output to the frontend; ShowPrompt nodes fed by it display it."""
+    if node_id is None or PromptServer is None or getattr(PromptServer, "instance", None) is None:
+        return
+    PromptServer.instance.send_sync(STREAM_EVENT, {"node": str(node_id), "text": text, "done": done})
+
+
+def is_interrupted():
+    return model_management is not None and model_management.processing_interrupted()
+
+
+def check_interrupted():
+    """Raise ComfyUI's interrupt exception if the user cancelled the queue."""
+    if model_management is not None:
+        model_management.throw_exception_if_processing_interrupted()
+
+
+class InterruptCriteria:
+    """Stopping criterion that ends `generate` as soon as the queue is interrupted."""
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return torch.full((input_ids.shape[0],), is_interrupted(), dtype=torch.bool, device=input_ids.device)
+
+
+class TextPusher:
+    """Throttles partial-text updates for one node."""
+
+    def __init__(self, node_id, interval: float = STREAM_INTERVAL):
+        self.node_id = node_id
+        self.interval = interval
+        self.last_sent = 0.0
+
+    def update(self, text: str):
+        now = time.monotonic()
+        if now - self.last_sent >= self.interval:
+            self.last_sent = now
+            send_text(self.node_id, text)
+
+    def finish(self, text: str):
+        send_text(self.node_id, text, done=True)
+
+
+class TokenStreamer:
+    """`streamer` for `model.generate` that pushes the decoded text as it grows.
+
+    Like transformers' TextStreamer it only handles a batch of one, and the first
+    `put` (the prompt) is skipped.
+    """
+
+    def __init__(self, tokenizer, node_id, interval: float = STREAM_INTERVAL):
+        self.tokenizer = tokenizer
+        self.pusher = TextPusher(node_id, interval)
+        self.token_ids = []
+        self.prompt_pending = True
+
+    def put(self, value):
+        if value.dim() > 1:
+            if value.shape[0] > 1:
+                raise ValueError("TokenStreamer only supports a batch size of 1")
+            value = value[0]
+        if self.prompt_pending:
+            self.prompt_pending = False
+            return
+        self.token_ids.extend(value.tolist())
+        self.pusher.update(self.text())
+
+    def end(self):
+        self.pusher.finish(self.text())
+
+    def text(self) -> str:
+        return self.tokenizer.decode(self.token_ids, skip_special_tokens=True)
@@ -1,13 +1,18 @@
 import importlib.util
 import os
 import sys
+import time
 
 current_dir = os.path.dirname(__file__)
 sys.path.insert(0, current_dir)
+for sub_dir in ("py", "AI"):
+    sys.path.insert(0, os.path.join(current_dir, sub_dir))
 
 NODE_CLASS_MAPPINGS = {}
 NODE_DISPLAY_NAME_MAPPINGS = {}
 WEB_DIRECTORY = "./web"
+# Seconds spent importing each module, reported once loading is done
+IMPORT_TIMES = {}
 
 def load_modules_from_directory(directory):
     if not os.path.exists(directory):
@@ -22,14 +27,18 @@ def load_modules_from_directory(directory):
             continue
 
         file_path = os.path.join(directory, file)
+        start_time = time.perf_counter()
         try:
-            spec = importlib.util.spec_from_file_location(module_name, file_path)
-            if spec is None or spec.loader is None:
-                continue
-                
-            module = importlib.util.module_from_spec(spec)
-            sys.modules[module_name] = module
-            spec.loader.exec_module(module)
+            # Shared helper modules may already have been imported by another node module
+            module = sys.modules.get(module_name)
+            if module is None or os.path.abspath(getattr(module, "__file__", None) or "") != os.path.abspath(file_path):
+                spec = importlib.util.spec_from_file_location(module_name, file_path)
+                if spec is None or spec.loader is None:
+                    continue
+
+                module = importlib.util.module_from_spec(spec)
+                sys.modules[module_name] = module
+                spec.loader.exec_module(module)
 
             if hasattr(module, "NODE_CLASS_MAPPINGS"):
                 NODE_CLASS_MAPPINGS.update(module.NODE_CLASS_MAPPINGS)
@@ -38,6 +47,14 @@ def load_modules_from_directory(directory):
                 
         except Exception as e:
             print(f"Error loading module {module_name}: {e}")
+        finally:
+            IMPORT_TIMES[module_name] = IMPORT_TIMES.get(module_name, 0.0) + time.perf_counter() - start_time
+
+def print_startup_report():
+    total = sum(IMPORT_TIMES.values())
+    print(f"🧿 WildPromptor: imported {len(IMPORT_TIMES)} modules in {total * 1000:.1f} ms")
+    for module_name, seconds in sorted(IMPORT_TIMES.items(), key=lambda x: x[1], reverse=True):
+        print(f"   {seconds * 1000:8.1f} ms  {module_name}")
 
 def load_javascript(web_directory):
     return []
@@ -45,6 +62,7 @@ def load_javascript(web_directory):
 load_modules_from_directory(current_dir)
 load_modules_from_directory(os.path.join(current_dir, "py"))
 load_modules_from_directory(os.path.join(current_dir, "AI"))
+print_startup_report()
 
 NODE_CLASS_MAPPINGS = dict(sorted(
     NODE_CLASS_MAPPINGS.items(),
@@ -2,10 +2,18 @@ import os
 import random
 import json
 from typing import Tuple, List, Dict, Any
+from WildPromptor_Wordlist import get_store, get_config
+from WildPromptor_Options import BATCH_WIDGETS, folder_inputs, validate_option, validate_widgets
+from WildPromptor_Batch import BatchPlan, RANDOM, ORDERED, DISABLED
+from WildPromptor_Watcher import add_listener
 
 def get_subfolder_names():
-    data_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
-    return [f for f in os.listdir(data_path) if os.path.isdir(os.path.join(data_path, f)) and f != '__pycache__']
+    # The custom list folder gets a node even before CustomListManager creates it
+    names = get_store().folder_names()
+    custom_folder = get_config().get('custom_folder', 'Custom')
+    if custom_folder and custom_folder not in names:
+        names = sorted(names + [custom_folder])
+    return names
 
 class BaseNode:
     _config = None
@@ -24,188 +32,81 @@ class PromptListNode(BaseNode):
     FUNCTION = "process_prompt"
     OUTPUT_IS_LIST = (True,)
     
-    # Class-level cache shared across all instances
-    _file_contents_cache = {}
-
     def get_txt_file_names(self):
-        return [f for f in os.listdir(self.data_path) if f.endswith(".txt")]
+        return get_store().list_files(self.FOLDER_NAME)
     
     def __init__(self):
         self.config = self.load_config()
-        self.data_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', self.FOLDER_NAME)
+        self.data_path = os.path.join(get_store().data_path, self.FOLDER_NAME)
         self.file_names = self.get_txt_file_names()
-        self.file_contents = self.load_file_contents()
-
-    def load_file_contents(self):
-        """Load file contents with class-level caching for better performance"""
-        file_contents = {}
-        for filename in self.file_names:
-            file_path = os.path.join(self.data_path, filename)
-            # Use class-level cache
-            if file_path in self._file_contents_cache:
-                file_contents[filename] = self._file_contents_cache[file_path]
-            else:
-                content = self.read_file_lines(filename)
-                file_contents[filename] = content
-                self._file_contents_cache[file_path] = content
-        return file_contents
 
     def read_file_lines(self, filename):
-        file_path = os.path.join(self.data_path, filename)
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                lines = [line.strip() for line in file if line.strip()]
-                titles = []
-                contents = []
-                for line in lines:
-                    if ' - ' in line:
-                        title, content = line.split(' - ', 1)
-                        titles.append(title)
-                        contents.append(content)
-                    else:
-                        titles.append(line)
-                        contents.append(line)
-                return titles, contents
-        except FileNotFoundError:
-            print(f"File not found: {file_path}")
-            return [], []
-        except Exception as e:
-            print(f"Error reading file {file_path}: {str(e)}")
-            return [], []
+        """Return (titles, contents) for a file from the shared wordlist store"""
+        return get_store().get_split(os.path.join(self.data_path, filename))
+
+    def read_key_lines(self, key):
+        """Return (titles, contents) for the file behind a widget key like `Female [42]`"""
+        file_path = get_store().resolve(self.FOLDER_NAME, key)
+        return get_store().get_split(file_path) if file_path else ([], [])
+
+    def read_key_sampler(self, key):
+        """Alias table for weighted draws from the file behind a widget key, None if unweighted"""
+        file_path = get_store().resolve(self.FOLDER_NAME, key)
+        return get_store().get_sampler(file_path) if file_path else None
 
     @classmethod
     def INPUT_TYPES(cls):
-        self = cls()
-        inputs = {"required": {}, "optional": {}}
-        for filename in self.file_names:
-            original_name = os.path.splitext(filename)[0]
-            cleaned_name = original_name.split('.', 1)[-1] if '.' in original_name else original_name
-            titles, contents = self.file_contents[filename]
-            item_count = len(titles) if titles else len(contents)
-            display_name = f"{cleaned_name} [{item_count}]"
-            inputs["optional"][display_name] = (["❌disabled", "🎲Random", "🔢ordered"] + titles, {"default": "❌disabled"})
-
-        inputs["optional"]["batch_size"] = ("INT", {"default": 1, "min": 1, "max": 1000})
+        inputs = {"required": {}, "optional": folder_inputs(cls.FOLDER_NAME, "titles")}
+
+        inputs["optional"]["batch_size"] = BATCH_WIDGETS["batch_size"]
         inputs["optional"]["allow_duplicates"] = ("BOOLEAN", {"default": False})
-        inputs["optional"]["seed"] = ("INT", {"default": 0, "min": 0, "max": 0xffffffffffffffff})
+        inputs["optional"]["seed"] = BATCH_WIDGETS["seed"]
 
         return inputs
 
+    @classmethod
+    def VALIDATE_INPUTS(cls, **kwargs):
+        # Long lists may not be inlined in INPUT_TYPES, so combo values are checked against the files here.
+        # Taking **kwargs turns off ComfyUI's own range checks, so the numeric widgets are checked too.
+        result = validate_widgets(kwargs, BATCH_WIDGETS)
+        if result is not True:
+            return result
+        for key, value in kwargs.items():
+            if key in ["batch_size", "seed", "allow_duplicates"]:
+                continue
+            result = validate_option(cls.FOLDER_NAME, key, value, "titles")
+            if result is not True:
+                return result
+        return True
+
     def process_prompt(self, batch_size=1, seed=0, allow_duplicates=False, **kwargs):
-        random.seed(seed)
-        all_prompts = []
-        used_values_map = {}
-        active_contents = {}
+        plan = BatchPlan()
 
         for key, value in kwargs.items():
             if key in ["batch_size", "seed", "allow_duplicates"]:
                 continue
-            if value in ["🎲Random", "🔢ordered"]:
-                cleaned_name = key.split(' [')[0]
-                original_name = self.get_original_filename(cleaned_name)
-                titles, contents = self.file_contents[original_name + '.txt']
-                if contents:
-                    active_contents[key] = contents
-                    if not allow_duplicates:
-                        used_values_map[key] = set()
-
-        if not allow_duplicates and active_contents:
-            max_possible_outputs = max(len(contents) for contents in active_contents.values())
-            batch_size = min(batch_size, max_possible_outputs)
-
-        for _ in range(batch_size):
-            prompt_parts = []
-            
-            for key, value in kwargs.items():
-                if key in ["batch_size", "seed", "allow_duplicates"]:
-                    continue
-                
-                current_value = self._get_value_for_key(
-                    key, value, active_contents, 
-                    used_values_map, allow_duplicates, _
-                )
-                
-                if current_value is not None:
-                    prompt_parts.append(str(current_value))
-
-            if prompt_parts:
-                all_prompts.append(", ".join(prompt_parts))
-
+            if value in [RANDOM, ORDERED]:
+                titles, contents = self.read_key_lines(key)
+                plan.add(value, contents, self.read_key_sampler(key))
+            elif value != DISABLED:
+                fixed_value = self._handle_specific_value(key, value)
+                if fixed_value is not None:
+                    plan.add_fixed(fixed_value)
+
+        option_sizes = plan.option_sizes()
+        if not allow_duplicates and option_sizes:
+            batch_size = min(batch_size, max(option_sizes))
+
+        all_prompts = plan.assemble(batch_size, seed, allow_duplicates)
         return (all_prompts,) if all_prompts else ([""],)
 
-    def _get_value_for_key(self, key, value, active_contents, used_values_map, allow_duplicates, current_index):
-        if value == "🎲Random":
-            return self._handle_random_mode(
-                key, active_contents, used_values_map, allow_duplicates
-            )
-        elif value == "🔢ordered":
-            return self._handle_ordered_mode(
-                key, active_contents, used_values_map, 
-                allow_duplicates, current_index
-            )
-        elif value not in ["❌disabled", "🎲Random", "🔢ordered"]:
-            return self._handle_specific_value(key, value)
-        return None
-
-    def _handle_random_mode(self, key, active_contents, used_values_map, allow_duplicates):
-        if key not in active_contents:
-            return None
-            
-        contents = active_contents[key]
-        if allow_duplicates:
-            return random.choice(contents)
-            
-        if len(used_values_map[key]) >= len(contents):
-            used_values_map[key].clear()
-            
-        available_contents = [c for c in contents if c not in used_values_map[key]]
-        if available_contents:
-            chosen_value = random.choice(available_contents)
-            used_values_map[key].add(chosen_value)
-            return chosen_value
-        return None
-
-    def _handle_ordered_mode(self, key, active_contents, used_values_map, allow_duplicates, current_index):
-        if key not in active_contents:
-            return None
-            
-        contents = active_contents[key]
-        index = current_index % len(contents)
-        current_value = contents[index]
-        
-        if allow_duplicates:
-            return current_value
-            
-        if len(used_values_map[key]) >= len(contents):
-            used_values_map[key].clear()
-            
-        if current_value not in used_values_map[key]:
-            used_values_map[key].add(current_value)
-            return current_value
-            
-        for i in range(len(contents)):
-            next_index = (index + i) % len(contents)
-            next_value = contents[next_index]
-            if next_value not in used_values_map[key]:
-                used_values_map[key].add(next_value)
-                return next_value
-        return None
-
     def _handle_specific_value(self, key, value):
-        cleaned_name = key.split(' [')[0]
-        original_name = self.get_original_filename(cleaned_name)
-        titles, contents = self.file_contents[original_name + '.txt']
+        titles, contents = self.read_key_lines(key)
         if titles and value in titles:
             index = titles.index(value)
             return contents[index]
         return None
 
-    def get_original_filename(self, cleaned_name):
-        for filename in self.file_names:
-            if cleaned_name in filename:
-                return os.path.splitext(filename)[0]
-        return cleaned_name
-
 class PromptConcatNode(BaseNode):
     RETURN_TYPES = ("STRING",)
     RETURN_NAMES = ("prompt",)
@@ -323,8 +224,8 @@ class KeywordPicker:
             return ("",)
         
         if pick_mode == "🎲Random":
-            random.seed(seed)
-            picked = random.sample(keyword_list, min(pick_count, len(keyword_list)))
+            rng = random.Random(seed)
+            picked = rng.sample(keyword_list, min(pick_count, len(keyword_list)))
         else:
             picked = keyword_list[:pick_count]
         
@@ -348,7 +249,23 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "KeywordPicker": "Keyword Picker 🔀",
 }
 
+def register_folder_node(folder, mappings=NODE_CLASS_MAPPINGS, display_names=NODE_DISPLAY_NAME_MAPPINGS):
+    node_name = f"{folder.capitalize()} 📋"
+    if node_name not in mappings:
+        mappings[node_name] = create_Promptor_node(folder)
+        display_names[node_name] = node_name
+
 for folder in get_subfolder_names():
-    node_class = create_Promptor_node(folder)
-    NODE_CLASS_MAPPINGS[f"{folder.capitalize()} 📋"] = node_class
-    NODE_DISPLAY_NAME_MAPPINGS[f"{folder.capitalize()} 📋"] = f"{folder.capitalize()} 📋"
\ No newline at end of file
+    register_folder_node(folder)
+
+def on_folders_added(changed_files, added_folders, removed_folders):
+    """Give folders created while ComfyUI runs a node too; it appears after the next page reload."""
+    try:
+        import nodes
+    except ImportError:
+        return
+    for folder in added_folders:
+        register_folder_node(folder)
+        register_folder_node(folder, nodes.NODE_CLASS_MAPPINGS, nodes.NODE_DISPLAY_NAME_MAPPINGS)
+
+add_listener(on_folders_added)
\ No newline at end of file
@@ -0,0 +1,109 @@
+import numpy as np
+from typing import List, Any, Optional
+from WildPromptor_Weights import AliasTable
+from WildPromptor_Sampler import NonRepeatingSampler
+
+RANDOM = "🎲Random"
+ORDERED = "🔢ordered"
+DISABLED = "❌disabled"
+FIXED = "fixed"
+
+MAX_BATCH_SIZE = 100000
+# Nodes print at most this many generated prompts to the console
+LOG_LIMIT = 20
+
+
+class BatchPlan:
+    """Vectorized batch prompt assembly.
+
+    Categories are added once per call (mode + options). `index_matrix` then
+    builds a (batch_size, n_categories) array of option indices column-group by
+    column-group with NumPy, and `assemble` gathers and joins the strings:
+
+    - 🎲Random with duplicates: `Generator.integers` for all such columns at once,
+      or one vectorized alias-table draw per weighted column
+    - 🎲Random without duplicates: one NonRepeatingSampler per category (a
+      weighted order for weighted columns), so no index repeats until the whole
+      list has been used
+    - 🔢ordered: `arange % size`
+    - fixed values: a constant column
+
+    Every `assemble` call draws from its own `numpy.random.default_rng(seed)`
+    and a plan holds no shared state, so plans can be built and assembled on
+    several threads at once and the same seed always gives the same batch.
+    """
+
+    def __init__(self):
+        self.modes = []
+        self.options = []
+        self.samplers = []
+
+    def __len__(self):
+        return len(self.modes)
+
+    def add(self, mode: str, options: List[Any], sampler: Optional[AliasTable] = None):
+        """Add a category. `sampler` (the list's alias table) makes 🎲Random draws weighted."""
+        if mode not in (RANDOM, ORDERED):
+            raise ValueError(f"Unsupported mode: {mode}")
+        if options:
+            self.modes.append(mode)
+            self.samplers.append(sampler if mode == RANDOM else None)
+            # Packed columns gather their own values (decoding only the picked lines)
+            self.options.append(options if hasattr(options, "take") else np.asarray(options, dtype=object))
+
+    def add_fixed(self, value: Any):
+        self.modes.append(FIXED)
+        self.samplers.append(None)
+        self.options.append(np.asarray([str(value)], dtype=object))
+
+    def option_sizes(self) -> List[int]:
+        """Option counts of the random/ordered categories (fixed values excluded)."""
+        return [len(opts) for mode, opts in zip(self.modes, self.options) if mode != FIXED]
+
+    def index_matrix(self, batch_size: int, rng: np.random.Generator, allow_duplicates: bool = True) -> np.ndarray:
+        indices = np.zeros((batch_size, len(self.modes)), dtype=np.int64)
+        if batch_size <= 0 or not self.modes:
+            return indices
+
+        sizes = np.array([len(opts) for opts in self.options], dtype=np.int64)
+        modes = np.array(self.modes, dtype=object)
+
+        ordered = np.flatnonzero(modes == ORDERED)
+        if ordered.size:
+            indices[:, ordered] = np.arange(batch_size)[:, None] % sizes[ordered]
+
+        weighted = np.array([sampler is not None for sampler in self.samplers], dtype=bool)
+        random_cols = np.flatnonzero((modes == RANDOM) & ~weighted)
+        if random_cols.size:
+            if allow_duplicates:
+                indices[:, random_cols] = rng.integers(0, sizes[random_cols], size=(batch_size, random_cols.size))
+            else:
+                for col in random_cols:
+                    indices[:, col] = NonRepeatingSampler(int(sizes[col]), rng).draw_many(batch_size)
+        for col in np.flatnonzero(weighted):
+            sampler = self.samplers[col]
+            if allow_duplicates:
+                indices[:, col] = sampler.sample(rng, batch_size)
+            else:
+                indices[:, col] = self._weighted_blocks(sampler, batch_size, rng)
+        return indices
+
+    @staticmethod
+    def _weighted_blocks(sampler: AliasTable, batch_size: int, rng: np.random.Generator) -> np.ndarray:
+        # Each block is one weighted pass over the lines with a non-zero weight
+        blocks = []
+        remaining = batch_size
+        while remaining > 0:
+            block = sampler.order(rng)[:remaining]
+            blocks.append(block)
+            remaining -= len(block)
+        return np.concatenate(blocks)
+
+    def assemble(self, batch_size: int, seed: int = 0, allow_duplicates: bool = True, separator: str = ", ") -> List[str]:
+        if not self.modes or batch_size <= 0:
+            return []
+        rng = np.random.default_rng(seed)
+        indices = self.index_matrix(batch_size, rng, allow_duplicates)
+        columns = [opts.take(indices[:, col]) for col, opts in enumerate(self.options)]
+        columns = [column.tolist() if isinstance(column, np.ndarray) else column for column in columns]
+        return [separator.join(row) for row in zip(*columns)]
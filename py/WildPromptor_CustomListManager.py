@@ -1,5 +1,92 @@
 import os
-import json
+import hashlib
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from WildPromptor_Wordlist import file_signature, get_store
+
+
+def line_key(line: str) -> bytes:
+    """Short digest of a stripped line, so the index doesn't hold the list's text."""
+    return hashlib.blake2b(line.encode('utf-8'), digest_size=8).digest()
+
+
+class LineIndex:
+    """Non-empty line count and line-digest multiset of one custom list file."""
+    __slots__ = ("signature", "count", "keys")
+
+    def __init__(self, signature, keys):
+        self.signature = signature
+        self.keys = keys
+        self.count = sum(keys.values())
+
+
+# Shared by every CustomListManager instance; entries are revalidated against (mtime_ns, size)
+_line_indexes = {}
+_files_lock = threading.RLock()
+
+
+def read_line_keys(file_path):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return Counter(line_key(line.strip()) for line in f if line.strip())
+
+
+def get_line_index(file_path):
+    """Cached LineIndex for `file_path`, rebuilt only if the file changed outside this node."""
+    path = os.path.abspath(file_path)
+    with _files_lock:
+        signature = file_signature(path)
+        index = _line_indexes.get(path)
+        if index is None or index.signature != signature:
+            index = LineIndex(signature, read_line_keys(path))
+            _line_indexes[path] = index
+        return index
+
+
+def file_written(file_path, keys):
+    """Record a write made by this node: refresh the line index and drop the store's copy."""
+    path = os.path.abspath(file_path)
+    _line_indexes[path] = LineIndex(file_signature(path), keys)
+    get_store().invalidate(path)
+
+
+@contextmanager
+def atomic_writer(file_path):
+    """Text file that replaces `file_path` through a synced temp file and rename when the block ends.
+
+    Readers never see a partial file; if the block raises, the original is left untouched.
+    """
+    temp_path = f"{file_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def write_atomic(file_path, text):
+    """Replace a file's contents atomically (see atomic_writer)."""
+    with atomic_writer(file_path) as f:
+        f.write(text)
+
+
+def append_lines(file_path, lines):
+    """Append lines without reading the file: O(size of the new lines), synced to disk."""
+    with open(file_path, 'ab+') as f:
+        f.seek(0, os.SEEK_END)
+        needs_newline = False
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b'\n'
+        data = ''.join(line + '\n' for line in lines).encode('utf-8')
+        f.write((b'\n' if needs_newline else b'') + data)
+        f.flush()
+        os.fsync(f.fileno())
+
 
 class CustomListManager:
     RETURN_TYPES = ("STRING", "STRING")
@@ -25,6 +112,8 @@ class CustomListManager:
                     "✏️ Edit List (Replace All)",
                     "➕ Add Line",
                     "➖ Remove Line",
+                    "📥 Bulk Add Lines",
+                    "📤 Bulk Remove Lines",
                     "📋 View List",
                     "🗑️ Delete List",
                 ], {"default": "📝 Create New List"}),
@@ -32,7 +121,7 @@ class CustomListManager:
             "optional": {
                 "file_name": ("STRING", {"default": "My_Custom_List", "multiline": False}),
                 "select_file": (file_options, {"default": file_options[0]}),
-                "content": ("STRING", {"default": "", "multiline": True}),
+                "content": ("STRING", {"default": "", "multiline": True, "tooltip": "List content; for bulk actions, one line to add or remove per line"}),
                 "line_text": ("STRING", {"default": "", "multiline": False}),
             }
         }
@@ -75,6 +164,12 @@ class CustomListManager:
             elif action == "➖ Remove Line":
                 return self.remove_line(target_file, line_text)
             
+            elif action == "📥 Bulk Add Lines":
+                return self.bulk_add(target_file, content)
+            
+            elif action == "📤 Bulk Remove Lines":
+                return self.bulk_remove(target_file, content)
+            
             elif action == "📋 View List":
                 return self.view_list(target_file)
             
@@ -93,9 +188,7 @@ class CustomListManager:
         file_path = self.get_file_path(filename)
         if os.path.exists(file_path):
             return (f"❌ Error: File already exists: {os.path.basename(file_path)}", self.get_file_list_string())
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content.strip())
-        line_count = len([line for line in content.strip().split('\n') if line.strip()])
+        line_count = self.replace_content(file_path, content)
         return (f"✅ Created: {os.path.basename(file_path)} ({line_count} lines)", self.get_file_list_string())
     
     def edit_list(self, filename, content):
@@ -104,9 +197,7 @@ class CustomListManager:
         file_path = self.get_file_path(filename)
         if not os.path.exists(file_path):
             return (f"❌ Error: File not found: {os.path.basename(file_path)}", self.get_file_list_string())
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content.strip())
-        line_count = len([line for line in content.strip().split('\n') if line.strip()])
+        line_count = self.replace_content(file_path, content)
         return (f"✅ Updated: {os.path.basename(file_path)} ({line_count} lines)", self.get_file_list_string())
     
     def add_line(self, filename, line_text):
@@ -117,13 +208,7 @@ class CustomListManager:
         file_path = self.get_file_path(filename)
         if not os.path.exists(file_path):
             return (f"❌ Error: File not found: {os.path.basename(file_path)}", self.get_file_list_string())
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        if content and not content.endswith('\n'):
-            content += '\n'
-        content += line_text.strip() + '\n'
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        self.append_to_file(file_path, [line_text.strip()])
         return (f"✅ Added to: {os.path.basename(file_path)}\nContent: {line_text.strip()}", self.get_file_list_string())
     
     def remove_line(self, filename, line_text):
@@ -134,18 +219,78 @@ class CustomListManager:
         file_path = self.get_file_path(filename)
         if not os.path.exists(file_path):
             return (f"❌ Error: File not found: {os.path.basename(file_path)}", self.get_file_list_string())
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
         target = line_text.strip()
-        original_count = len(lines)
-        filtered_lines = [line for line in lines if line.strip() != target]
-        removed_count = original_count - len(filtered_lines)
+        removed_count = self.remove_from_file(file_path, {target})
         if removed_count == 0:
             return (f"⚠️ Line not found: {target}", self.get_file_list_string())
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.writelines(filtered_lines)
         return (f"✅ Removed {removed_count} line(s): {target}", self.get_file_list_string())
     
+    def bulk_add(self, filename, content):
+        if not filename or filename in ["<Select File>", "<No Custom Files>"]:
+            return ("❌ Error: Please select or input filename", self.get_file_list_string())
+        lines = [line.strip() for line in content.split('\n') if line.strip()]
+        if not lines:
+            return ("❌ Error: Please input content to add", self.get_file_list_string())
+        file_path = self.get_file_path(filename)
+        if not os.path.exists(file_path):
+            return (f"❌ Error: File not found: {os.path.basename(file_path)}", self.get_file_list_string())
+        self.append_to_file(file_path, lines)
+        return (f"✅ Added {len(lines)} line(s) to: {os.path.basename(file_path)}", self.get_file_list_string())
+    
+    def bulk_remove(self, filename, content):
+        if not filename or filename in ["<Select File>", "<No Custom Files>"]:
+            return ("❌ Error: Please select or input filename", self.get_file_list_string())
+        targets = {line.strip() for line in content.split('\n') if line.strip()}
+        if not targets:
+            return ("❌ Error: Please input content to remove", self.get_file_list_string())
+        file_path = self.get_file_path(filename)
+        if not os.path.exists(file_path):
+            return (f"❌ Error: File not found: {os.path.basename(file_path)}", self.get_file_list_string())
+        removed_count = self.remove_from_file(file_path, targets)
+        if removed_count == 0:
+            return (f"⚠️ None of the {len(targets)} line(s) were found", self.get_file_list_string())
+        return (f"✅ Removed {removed_count} line(s) from: {os.path.basename(file_path)}", self.get_file_list_string())
+    
+    def replace_content(self, file_path, content):
+        """Atomically write `content` as the whole list; returns its line count."""
+        text = content.strip()
+        with _files_lock:
+            write_atomic(file_path, text)
+            keys = Counter(line_key(line.strip()) for line in text.split('\n') if line.strip())
+            file_written(file_path, keys)
+        return sum(keys.values())
+    
+    def append_to_file(self, file_path, lines):
+        with _files_lock:
+            keys = Counter(get_line_index(file_path).keys)
+            append_lines(file_path, lines)
+            keys.update(line_key(line) for line in lines)
+            file_written(file_path, keys)
+    
+    def remove_from_file(self, file_path, targets):
+        """Remove every line matching one of `targets`; returns how many were removed.
+
+        The line index answers "not present" without reading the file; otherwise
+        the file is streamed once, line by line, into an atomic rewrite, so
+        only one line is held in memory at a time.
+        """
+        with _files_lock:
+            index = get_line_index(file_path)
+            if not any(index.keys.get(line_key(target)) for target in targets):
+                return 0
+            removed_count = 0
+            with atomic_writer(file_path) as out, open(file_path, 'r', encoding='utf-8', newline='') as f:
+                for line in f:
+                    if line.strip() in targets:
+                        removed_count += 1
+                    else:
+                        out.write(line)
+            keys = Counter(index.keys)
+            for target in targets:
+                keys.pop(line_key(target), None)
+            file_written(file_path, keys)
+        return removed_count
+    
     def view_list(self, filename):
         if not filename or filename in ["<Select File>", "<No Custom Files>"]:
             return ("❌ Error: Please select or input filename", self.get_file_list_string())
@@ -165,7 +310,10 @@ class CustomListManager:
         file_path = self.get_file_path(filename)
         if not os.path.exists(file_path):
             return (f"❌ Error: File not found: {os.path.basename(file_path)}", self.get_file_list_string())
-        os.remove(file_path)
+        with _files_lock:
+            os.remove(file_path)
+            _line_indexes.pop(os.path.abspath(file_path), None)
+            get_store().invalidate(os.path.abspath(file_path))
         return (f"🗑️ Deleted: {os.path.basename(file_path)}", self.get_file_list_string())
     
     def get_file_list_string(self):
@@ -176,9 +324,7 @@ class CustomListManager:
         for i, filename in enumerate(files, 1):
             file_path = os.path.join(self.custom_path, filename)
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = [line for line in f.read().split('\n') if line.strip()]
-                    line_count = len(lines)
+                line_count = get_line_index(file_path).count
                 file_list += f"{i}. {filename} ({line_count} lines)\n"
             except:
                 file_list += f"{i}. {filename}\n"
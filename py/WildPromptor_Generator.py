@@ -1,61 +1,45 @@
 import os
-import random
-import json
 from typing import Tuple, List, Dict, Any
+from WildPromptor_Wordlist import get_store, get_config, all_in_one_folders
+from WildPromptor_Options import folder_inputs, validate_option
+from WildPromptor_Batch import BatchPlan, RANDOM, ORDERED, DISABLED, MAX_BATCH_SIZE, LOG_LIMIT
 
 class WildPromptor_AllInOneList:
     RETURN_TYPES = ("DPROMPT_DATA",)
     RETURN_NAMES = ("selected_options",)
     FUNCTION = "select_options"
     CATEGORY = "🧪AILab/🧿WildPromptor/📋Prompts List"
-    
-    # Class-level cache shared across all instances
-    _file_cache = {}
 
     def __init__(self):
         self.config = self.load_config()
         self.data_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), self.config['data_path'])
 
     def load_config(self):
-        config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.json')
-        with open(config_path, 'r') as f:
-            return json.load(f)
+        return get_config()
 
     @classmethod
     def INPUT_TYPES(cls):
-        self = cls()
         inputs = {"required": {}, "optional": {}}
-        
-        for folder in self.config['folders']:
-            folder_path = os.path.join(self.data_path, folder)
-            if os.path.exists(folder_path):
-                for file in os.listdir(folder_path):
-                    if file.endswith('.txt'):
-                        original_name = os.path.splitext(file)[0]
-                        cleaned_name = original_name.split('.', 1)[-1] if '.' in original_name else original_name
-                        file_path = os.path.join(folder_path, file)
-                        options = self.read_file_options(file_path)
-                        item_count = len(options)
-                        display_name = f"{folder} - {cleaned_name} [{item_count}]"
-                        inputs["optional"][display_name] = (["❌disabled", "🎲Random", "🔢ordered"] + options, {"default": "❌disabled"})
-        
+        for folder in all_in_one_folders():
+            inputs["optional"].update(folder_inputs(folder, "lines", prefix=f"{folder} - "))
         return inputs
 
+    @classmethod
+    def VALIDATE_INPUTS(cls, **kwargs):
+        # Long lists may not be inlined in INPUT_TYPES, so combo values are checked against the files here.
+        # This node has only combo inputs, so nothing else loses ComfyUI's own checks.
+        for key, value in kwargs.items():
+            if ' - ' not in key:
+                continue
+            folder, file_info = key.split(' - ', 1)
+            result = validate_option(folder, file_info, value, "lines")
+            if result is not True:
+                return result
+        return True
+
     def read_file_options(self, file_path: str) -> List[str]:
-        """Read file options with class-level caching for better performance"""
-        if file_path in self._file_cache:
-            return self._file_cache[file_path]
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                options = [line.strip() for line in file if line.strip()]
-            self._file_cache[file_path] = options
-            return options
-        except FileNotFoundError:
-            print(f"File not found: {file_path}")
-            return []
-        except Exception as e:
-            print(f"Error reading file {file_path}: {str(e)}")
-            return []
+        """Read file options from the shared wordlist store"""
+        return get_store().get_lines(file_path)
 
     def select_options(self, **kwargs):
         selected_options = {k: v for k, v in kwargs.items() if v != "❌disabled"}
@@ -69,25 +53,20 @@ class WildPromptor_Generator:
     FUNCTION = "process_prompt"
     OUTPUT_IS_LIST = (True,)
     CATEGORY = "🧪AILab/🧿WildPromptor"
-    
-    # Class-level cache shared across all instances  
-    _file_cache = {}
 
     def __init__(self):
         self.config = self.load_config()
         self.data_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), self.config['data_path'])
 
     def load_config(self):
-        config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.json')
-        with open(config_path, 'r') as f:
-            return json.load(f)
+        return get_config()
 
     @classmethod
     def INPUT_TYPES(cls):
         return {
             "required": {
                 "selected_options": ("DPROMPT_DATA",),
-                "batch_size": ("INT", {"default": 1, "min": 1, "max": 1000}),
+                "batch_size": ("INT", {"default": 1, "min": 1, "max": MAX_BATCH_SIZE}),
                 "seed": ("INT", {"default": 0, "min": 0, "max": 0xffffffffffffffff}),
             },
             "optional": {
@@ -96,65 +75,38 @@ class WildPromptor_Generator:
         }
 
     def process_prompt(self, selected_options: Dict[str, Any], batch_size: int, seed: int, allow_duplicates: bool = True) -> Tuple[List[str]]:
-        random.seed(seed)
-        all_prompts = []
-
-        for i in range(batch_size):
-            prompt_parts = []
-            for key, value in selected_options.items():
-                if value == "🎲Random":
-                    folder, file_info = key.rsplit(' - ', 1)
-                    cleaned_name = file_info.split(' [')[0]
-                    original_name = self.get_original_filename(folder, cleaned_name)
-                    file_path = os.path.join(self.data_path, folder, f"{original_name}.txt")
-                    options = self.read_file_options(file_path)
-                    if options:
-                        if allow_duplicates:
-                            prompt_parts.append(random.choice(options))
-                        else:
-                            prompt_parts.append(random.sample(options, 1)[0])
-                elif value == "🔢ordered":
-                    folder, file_info = key.rsplit(' - ', 1)
-                    cleaned_name = file_info.split(' [')[0]
-                    original_name = self.get_original_filename(folder, cleaned_name)
-                    file_path = os.path.join(self.data_path, folder, f"{original_name}.txt")
-                    options = self.read_file_options(file_path)
-                    if options:
-                        index = i % len(options)
-                        prompt_parts.append(options[index])
-                elif value != "❌disabled":
-                    prompt_parts.append(str(value))
-            
-            if prompt_parts:
-                all_prompts.append(", ".join(prompt_parts))
-
-        for prompt in all_prompts:
+        # Resolve every category once; the batch itself is assembled in one vectorized pass
+        plan = BatchPlan()
+        for key, value in selected_options.items():
+            if value in [RANDOM, ORDERED]:
+                plan.add(value, self.read_key_options(key), self.read_key_sampler(key))
+            elif value != DISABLED:
+                plan.add_fixed(value)
+
+        all_prompts = plan.assemble(batch_size, seed, allow_duplicates)
+
+        for prompt in all_prompts[:LOG_LIMIT]:
             print(f"🔀 WildPromptor Generator output: {prompt}")
+        if len(all_prompts) > LOG_LIMIT:
+            print(f"🔀 WildPromptor Generator: {len(all_prompts) - LOG_LIMIT} more prompts not shown")
 
         return (all_prompts,)
 
-    def get_original_filename(self, folder, cleaned_name):
-        folder_path = os.path.join(self.data_path, folder)
-        for filename in os.listdir(folder_path):
-            if filename.endswith('.txt') and cleaned_name.split(' [')[0] in filename:
-                return os.path.splitext(filename)[0]
-        return cleaned_name.split(' [')[0]
-
     def read_file_options(self, file_path: str) -> List[str]:
-        """Read file options with class-level caching for better performance"""
-        if file_path in self._file_cache:
-            return self._file_cache[file_path]
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                options = [line.strip() for line in file if line.strip()]
-            self._file_cache[file_path] = options
-            return options
-        except FileNotFoundError:
-            print(f"File not found: {file_path}")
-            return []
-        except Exception as e:
-            print(f"Error reading file {file_path}: {str(e)}")
-            return []
+        """Read file options from the shared wordlist store"""
+        return get_store().get_lines(file_path)
+
+    def read_key_options(self, key: str) -> List[str]:
+        """Read the options behind a widget key like `Subject - Female [42]`"""
+        folder, file_info = key.rsplit(' - ', 1)
+        file_path = get_store().resolve(folder, file_info)
+        return self.read_file_options(file_path) if file_path else []
+
+    def read_key_sampler(self, key: str):
+        """Alias table for weighted draws from the file behind a widget key, None if unweighted"""
+        folder, file_info = key.rsplit(' - ', 1)
+        file_path = get_store().resolve(folder, file_info)
+        return get_store().get_sampler(file_path) if file_path else None
 
 NODE_CLASS_MAPPINGS = {
     "WildPromptor_AllInOneList": WildPromptor_AllInOneList,
@@ -0,0 +1,116 @@
+import os
+from typing import Dict, Any, List
+from WildPromptor_Wordlist import get_store, get_config, clean_name
+from WildPromptor_Batch import RANDOM, ORDERED, DISABLED, MAX_BATCH_SIZE
+
+MODE_OPTIONS = [DISABLED, RANDOM, ORDERED]
+MAX_PAGE_SIZE = 5000
+DEFAULT_INLINE_LIMIT = 500
+
+# Numeric widgets shared by the batch nodes, declared once so VALIDATE_INPUTS can check them too
+BATCH_WIDGETS = {
+    "batch_size": ("INT", {"default": 1, "min": 1, "max": MAX_BATCH_SIZE}),
+    "seed": ("INT", {"default": 0, "min": 0, "max": 0xffffffffffffffff}),
+}
+
+
+def inline_limit() -> int:
+    """Lists longer than this are served through /wildpromptor/options instead of INPUT_TYPES (0 = inline all)."""
+    return int(get_config().get('inline_option_limit', DEFAULT_INLINE_LIMIT) or 0)
+
+
+def read_values(file_path: str, field: str) -> List[str]:
+    """`titles` for the folder list nodes, full `lines` for the All-in-One nodes."""
+    store = get_store()
+    if field == "titles":
+        return store.get_split(file_path)[0]
+    return store.get_lines(file_path)
+
+
+def folder_inputs(folder: str, field: str, prefix: str = "") -> Dict[str, Any]:
+    """Build the category combo inputs for one data folder from the store's manifest.
+
+    Only file names and entry counts are needed unless a list is small enough to
+    be inlined, so this never constructs a node or parses skipped files.
+    """
+    store = get_store()
+    limit = inline_limit()
+    inputs = {}
+    for filename in store.list_files(folder):
+        file_path = os.path.join(store.data_path, folder, filename)
+        cleaned_name = clean_name(filename)
+        item_count = store.count(file_path)
+        display_name = f"{prefix}{cleaned_name} [{item_count}]"
+        if limit and item_count > limit:
+            remote = {"folder": folder, "name": cleaned_name, "field": field}
+            inputs[display_name] = (list(MODE_OPTIONS), {"default": DISABLED, "wildpromptor_remote": remote})
+        else:
+            inputs[display_name] = (MODE_OPTIONS + list(read_values(file_path, field)), {"default": DISABLED})
+    return inputs
+
+
+def validate_option(folder: str, key: str, value: Any, field: str):
+    """Check a category selection against the file on disk. Returns True or an error message."""
+    if value in MODE_OPTIONS:
+        return True
+    file_path = get_store().resolve(folder, key)
+    if file_path is None:
+        return f"Unknown list: {key}"
+    if value not in read_values(file_path, field):
+        return f"Value not in list: {key}: '{value}'"
+    return True
+
+
+def validate_widgets(values: Dict[str, Any], widgets: Dict[str, tuple]):
+    """Type and min/max checks for INT and FLOAT widgets. Returns True or an error message.
+
+    ComfyUI skips its own checks for every input of a node whose VALIDATE_INPUTS
+    takes **kwargs, so those nodes repeat them here. Linked inputs arrive as None.
+    """
+    for name, (kind, options) in widgets.items():
+        value = values.get(name)
+        if value is None or kind not in ("INT", "FLOAT"):
+            continue
+        try:
+            value = int(value) if kind == "INT" else float(value)
+        except (TypeError, ValueError):
+            return f"{name}: failed to convert '{value}' to {kind}"
+        if "min" in options and value < options["min"]:
+            return f"{name}: value {value} smaller than min of {options['min']}"
+        if "max" in options and value > options["max"]:
+            return f"{name}: value {value} bigger than max of {options['max']}"
+    return True
+
+
+def option_page(folder: str, name: str, field: str = "titles", offset: int = 0, limit: int = 1000, query: str = "") -> Dict[str, Any]:
+    """One page of a list's values, optionally filtered by a case-insensitive substring."""
+    store = get_store()
+    # Only folders under data/ can be served
+    file_path = store.resolve(folder, name) if folder in store.folder_names() else None
+    values = read_values(file_path, field) if file_path else []
+    if query:
+        query = query.lower()
+        values = [v for v in values if query in v.lower()]
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    offset = max(0, offset)
+    return {"total": len(values), "offset": offset, "options": values[offset:offset + limit]}
+
+
+try:
+    from server import PromptServer
+    from aiohttp import web
+except ImportError:
+    PromptServer = None
+
+if PromptServer is not None and getattr(PromptServer, "instance", None) is not None:
+    @PromptServer.instance.routes.get("/wildpromptor/options")
+    async def get_options(request):
+        params = request.rel_url.query
+        try:
+            offset = int(params.get("offset", 0))
+            limit = int(params.get("limit", 1000))
+        except ValueError:
+            return web.json_response({"error": "offset and limit must be integers"}, status=400)
+        page = option_page(params.get("folder", ""), params.get("name", ""), params.get("field", "titles"),
+                           offset, limit, params.get("q", ""))
+        return web.json_response(page)
@@ -0,0 +1,249 @@
+import os
+import sys
+import mmap
+import struct
+import threading
+from array import array
+from collections.abc import Sequence
+from typing import Dict, List, Optional, Tuple
+from WildPromptor_Weights import split_weight
+
+PACK_NAME = "wordlists.wpack"
+_MAGIC = b"WPPACK02"
+# magic, file count, total lines, offsets position, weights position, splits position, blob position
+_HEADER = struct.Struct("<8sIIQQQQ")
+# name length, source mtime_ns, source size, first line, line count
+_FILE = struct.Struct("<HqqII")
+_SEPARATOR = b" - "
+
+LINE, TITLE, CONTENT = 0, 1, 2
+
+
+def _to_little_endian(values: array) -> array:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+def read_source_lines(path: str) -> List[Tuple[bytes, float]]:
+    """(UTF-8 line, weight) pairs, matching how the wordlist store parses .txt files."""
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = [split_weight(line.strip()) for line in f if line.strip()]
+    return [(text.encode('utf-8'), 1.0 if weight is None else weight) for text, weight in lines]
+
+
+def build_pack(folder_path: str) -> Tuple[str, int]:
+    """Compile every .txt file in `folder_path` into one pack; returns (pack path, line count).
+
+    Layout after the header: the file table (name, source signature, line
+    range), then `array('Q')` line start offsets (one extra for the end), then
+    `array('d')` line weights (1.0 unless the line had a `:: weight` suffix), then
+    `array('i')` byte positions of the first ' - ' in each line (-1 for none),
+    then the UTF-8 blob of all lines. Files that can't be decoded are left out
+    and keep being read from their .txt source.
+    """
+    file_names = sorted(f for f in os.listdir(folder_path) if f.endswith('.txt'))
+    table = []
+    offsets = array('Q', [0])
+    weights = array('d')
+    splits = array('i')
+    chunks = []
+    blob_size = 0
+    for name in file_names:
+        path = os.path.join(folder_path, name)
+        st = os.stat(path)
+        try:
+            lines = read_source_lines(path)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"[Pack] Skipping {path}: {e}")
+            continue
+        table.append((name.encode('utf-8'), st.st_mtime_ns, st.st_size, len(splits), len(lines)))
+        for line, weight in lines:
+            chunks.append(line)
+            weights.append(weight)
+            blob_size += len(line)
+            offsets.append(blob_size)
+            splits.append(line.find(_SEPARATOR))
+
+    table_bytes = b"".join(_FILE.pack(len(name), mtime, size, first, count) + name
+                           for name, mtime, size, first, count in table)
+    offsets_pos = _HEADER.size + len(table_bytes)
+    offsets_pos += -offsets_pos % 8
+    weights_pos = offsets_pos + len(offsets) * offsets.itemsize
+    splits_pos = weights_pos + len(weights) * weights.itemsize
+    blob_pos = splits_pos + len(splits) * splits.itemsize
+
+    pack_path = os.path.join(folder_path, PACK_NAME)
+    temp_path = f"{pack_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, len(table), len(splits), offsets_pos, weights_pos, splits_pos, blob_pos))
+        f.write(table_bytes)
+        f.write(b"\0" * (offsets_pos - f.tell()))
+        _to_little_endian(offsets).tofile(f)
+        _to_little_endian(weights).tofile(f)
+        _to_little_endian(splits).tofile(f)
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(temp_path, pack_path)
+    return pack_path, len(splits)
+
+
+class PackedColumn(Sequence):
+    """Read-only list view of one file's lines, titles or contents inside a pack.
+
+    Strings are decoded from the shared memory map on access, so an unused
+    column costs nothing and a used one only what is actually read.
+    """
+    __slots__ = ("pack", "start", "count", "kind")
+
+    def __init__(self, pack, start: int, count: int, kind: int):
+        self.pack = pack
+        self.start = start
+        self.count = count
+        self.kind = kind
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.pack.text(self.start + i, self.kind) for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("packed column index out of range")
+        return self.pack.text(self.start + index, self.kind)
+
+    def __iter__(self):
+        text = self.pack.text
+        for i in range(self.start, self.start + self.count):
+            yield text(i, self.kind)
+
+    def take(self, indices) -> List[str]:
+        """Values at many positions, like numpy's take; used by BatchPlan."""
+        text, start, kind = self.pack.text, self.start, self.kind
+        return [text(start + int(i), kind) for i in indices]
+
+
+class WordlistPack:
+    """Memory-mapped pack built by `build_pack`, shared by every process that opens it."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.signature = None
+        self.files: Dict[str, Tuple[Tuple[int, int], int, int]] = {}
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            st = os.fstat(self._file.fileno())
+            self.signature = (st.st_mtime_ns, st.st_size)
+            magic, file_count, total_lines, offsets_pos, weights_pos, splits_pos, blob_pos = _HEADER.unpack_from(self._mmap, 0)
+            if magic != _MAGIC:
+                raise ValueError(f"Not a wordlist pack: {path}")
+            position = _HEADER.size
+            for _ in range(file_count):
+                name_len, mtime, size, first, count = _FILE.unpack_from(self._mmap, position)
+                position += _FILE.size
+                name = self._mmap[position:position + name_len].decode('utf-8')
+                position += name_len
+                self.files[name] = ((mtime, size), first, count)
+            if not (position <= offsets_pos and weights_pos == offsets_pos + (total_lines + 1) * 8
+                    and splits_pos == weights_pos + total_lines * 8 and blob_pos == splits_pos + total_lines * 4
+                    and blob_pos <= len(self._mmap)):
+                raise ValueError(f"Truncated or corrupt wordlist pack: {path}")
+            self._map_columns(offsets_pos, weights_pos, splits_pos, blob_pos)
+            if blob_pos + self.offsets[total_lines] != len(self._mmap):
+                raise ValueError(f"Truncated or corrupt wordlist pack: {path}")
+            self.blob_pos = blob_pos
+        except Exception:
+            self.close()
+            raise
+
+    def _map_columns(self, offsets_pos: int, weights_pos: int, splits_pos: int, blob_pos: int):
+        # The whole-map view is released before returning, also on error, so that
+        # close() can unmap the file once the column views are released
+        view = memoryview(self._mmap)
+        try:
+            if sys.byteorder == "little":
+                # Zero-copy views straight into the map
+                self.offsets = view[offsets_pos:weights_pos].cast('Q')
+                self.weights = view[weights_pos:splits_pos].cast('d')
+                self.splits = view[splits_pos:blob_pos].cast('i')
+            else:
+                self.offsets = _to_little_endian(array('Q', view[offsets_pos:weights_pos].tobytes()))
+                self.weights = _to_little_endian(array('d', view[weights_pos:splits_pos].tobytes()))
+                self.splits = _to_little_endian(array('i', view[splits_pos:blob_pos].tobytes()))
+        finally:
+            view.release()
+
+    def entry(self, name: str, signature):
+        """(lines, titles, contents, weights) for a file if the pack holds it at `signature`, else None.
+
+        `weights` is a view of the file's line weights, or None when they are all 1.
+        """
+        record = self.files.get(name)
+        if record is None or record[0] != signature:
+            return None
+        _, first, count = record
+        weights = self.weights[first:first + count]
+        if all(w == 1.0 for w in weights):
+            weights = None
+        lines = PackedColumn(self, first, count, LINE)
+        if all(self.splits[i] < 0 for i in range(first, first + count)):
+            # Like split_titles: files without titles share one list for all three
+            return lines, lines, lines, weights
+        return lines, PackedColumn(self, first, count, TITLE), PackedColumn(self, first, count, CONTENT), weights
+
+    def text(self, line: int, kind: int = LINE) -> str:
+        start = self.blob_pos + self.offsets[line]
+        end = self.blob_pos + self.offsets[line + 1]
+        split = self.splits[line]
+        if split >= 0 and kind == TITLE:
+            end = start + split
+        elif split >= 0 and kind == CONTENT:
+            start += split + len(_SEPARATOR)
+        return self._mmap[start:end].decode('utf-8')
+
+    def close(self):
+        for attr in ("offsets", "weights", "splits"):
+            value = getattr(self, attr, None)
+            if isinstance(value, memoryview):
+                value.release()
+            setattr(self, attr, None)
+        if getattr(self, "_mmap", None) is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+
+# path -> (signature, pack); a pack that failed to open is cached as (signature, None)
+_packs = {}
+_packs_lock = threading.Lock()
+
+
+def get_pack(folder_path: str) -> Optional[WordlistPack]:
+    """The folder's pack, reopened when the pack file is rebuilt; None if there is none.
+
+    An unreadable pack is remembered with its stat signature, so it is only
+    retried (and reported) again once the file's mtime or size changes.
+    """
+    path = os.path.join(folder_path, PACK_NAME)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    signature = (st.st_mtime_ns, st.st_size)
+    with _packs_lock:
+        cached = _packs.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        try:
+            # The old map stays valid for columns still in use; it is released with them
+            pack = WordlistPack(path)
+        except Exception as e:
+            print(f"[Pack] Ignoring unreadable pack {path}: {e}")
+            _packs[path] = (signature, None)
+            return None
+        _packs[path] = (pack.signature, pack)
+        return pack
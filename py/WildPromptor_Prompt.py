@@ -1,6 +1,3 @@
-import requests
-import os
-
 class WildPromptor_ShowPrompt:
     @classmethod
     def INPUT_TYPES(cls):
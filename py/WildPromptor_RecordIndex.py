@@ -0,0 +1,216 @@
+import os
+import re
+import sys
+import mmap
+import struct
+import threading
+from array import array
+from typing import List, Iterable
+
+INDEX_SUFFIX = ".idx"
+_MAGIC = b"WPIDX003"
+# magic, source mtime_ns, source size, record count, separator byte length;
+# then the separator and zero padding up to the 8-aligned offsets array
+_HEADER = struct.Struct("<8sQQQI")
+# The line boundaries of str.splitlines(), as UTF-8 bytes
+_LINE_BREAK = re.compile(rb"\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e]|\xc2\x85|\xe2\x80[\xa8\xa9]")
+
+
+def clean_line(line: str) -> str:
+    """How a newline-separated record is cleaned: trailing commas, then whitespace."""
+    return line.rstrip(',').strip()
+
+
+def _offsets_position(sep_len: int) -> int:
+    position = _HEADER.size + sep_len
+    return position + (-position % 8)
+
+
+def _to_little_endian(offsets: array) -> array:
+    if sys.byteorder == "big":
+        offsets = array('Q', offsets)
+        offsets.byteswap()
+    return offsets
+
+
+class RecordIndex:
+    """Random access to the records of a large prompt file.
+
+    Records are located once and their (start, end) byte offsets stored in a
+    `<file>.idx` sidecar as a flat `array('Q')`. The sidecar is reused while the
+    source file's mtime and size are unchanged and rebuilt otherwise. It is
+    memory-mapped rather than read, so an open index costs page cache instead
+    of heap memory per record. Reads memory-map the source too and decode only
+    the requested slices, so fetching k records costs O(k) no matter where
+    they sit in the file.
+
+    Record boundaries follow WildPromptor_DataToPromptList: an empty separator
+    splits on the same line breaks as `str.splitlines` and cleans each line with
+    `clean_line`, any other separator splits on that exact string. Empty
+    records are skipped.
+    """
+
+    def __init__(self, path: str, separator: str, offsets: array, signature):
+        self.path = path
+        self.separator = separator
+        self.offsets = offsets
+        self.signature = signature
+        self._file = None
+        self._mmap = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.offsets) // 2
+
+    @classmethod
+    def open(cls, path: str, separator: str = "") -> "RecordIndex":
+        """Load the sidecar index for `path`, building and saving it if missing or stale."""
+        st = os.stat(path)
+        signature = (st.st_mtime_ns, st.st_size)
+        offsets = cls._load(path, separator, signature)
+        if offsets is None:
+            offsets = cls._build(path, separator)
+            # Map the saved sidecar so the freshly built array can be dropped
+            if cls._save(path, separator, signature, offsets):
+                offsets = cls._load(path, separator, signature) or offsets
+        return cls(path, separator, offsets, signature)
+
+    @staticmethod
+    def _load(path, separator, signature):
+        """Offsets from a valid sidecar, or None.
+
+        On little-endian hosts this is a zero-copy `'Q'` view of the mapped
+        sidecar, as in WildPromptor_Pack; the map is released with the view.
+        """
+        index_path = path + INDEX_SUFFIX
+        sep_bytes = separator.encode('utf-8')
+        try:
+            with open(index_path, 'rb') as f:
+                index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            magic, mtime, size, count, sep_len = _HEADER.unpack_from(index_map, 0)
+            start = _offsets_position(sep_len)
+            if (magic != _MAGIC or (mtime, size) != signature
+                    or index_map[_HEADER.size:_HEADER.size + sep_len] != sep_bytes
+                    or len(index_map) != start + count * 16):
+                index_map.close()
+                return None
+        except struct.error:
+            index_map.close()
+            return None
+        if sys.byteorder != "little":
+            offsets = _to_little_endian(array('Q', index_map[start:]))
+            index_map.close()
+            return offsets
+        view = memoryview(index_map)
+        try:
+            return view[start:].cast('Q')
+        finally:
+            view.release()
+
+    @staticmethod
+    def _save(path, separator, signature, offsets):
+        index_path = path + INDEX_SUFFIX
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        sep_bytes = separator.encode('utf-8')
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(_HEADER.pack(_MAGIC, signature[0], signature[1], len(offsets) // 2, len(sep_bytes)))
+                f.write(sep_bytes)
+                f.write(b"\0" * (_offsets_position(len(sep_bytes)) - f.tell()))
+                _to_little_endian(offsets).tofile(f)
+            os.replace(tmp_path, index_path)
+            return True
+        except OSError as e:
+            # Read-only dataset locations still work, the index just lives in memory
+            print(f"Could not write index {index_path}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+
+    @staticmethod
+    def _build(path, separator):
+        offsets = array('Q')
+        size = os.path.getsize(path)
+        if size == 0:
+            return offsets
+
+        clean = clean_line if separator == "" else str.strip
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            for pos, end in RecordIndex._spans(buf, size, separator):
+                # Clean the decoded text so records match the str-based paths exactly
+                record = buf[pos:end].decode('utf-8', errors='replace')
+                cleaned = clean(record)
+                if cleaned:
+                    start = pos + len(record[:len(record) - len(record.lstrip())].encode('utf-8'))
+                    offsets.append(start)
+                    offsets.append(start + len(cleaned.encode('utf-8')))
+        return offsets
+
+    @staticmethod
+    def _spans(buf, size, separator):
+        """(start, end) byte ranges of the raw records between separators."""
+        pos = 0
+        if separator == "":
+            for match in _LINE_BREAK.finditer(buf):
+                yield pos, match.start()
+                pos = match.end()
+            if pos < size:
+                yield pos, size
+            return
+        sep = separator.encode('utf-8')
+        while True:
+            end = buf.find(sep, pos)
+            if end == -1:
+                yield pos, size
+                return
+            yield pos, end
+            pos = end + len(sep)
+
+    def record(self, i: int) -> str:
+        start, end = self.offsets[2 * i], self.offsets[2 * i + 1]
+        record = self._buffer()[start:end].decode('utf-8', errors='replace').strip()
+        # Text-mode reads translate '\r\n' and '\r' to '\n'; custom-separator records keep them
+        return record.replace('\r\n', '\n').replace('\r', '\n') if self.separator else record
+
+    def records(self, indices: Iterable[int]) -> List[str]:
+        return [self.record(i) for i in indices]
+
+    def _buffer(self):
+        with self._lock:
+            if self._mmap is None:
+                self._file = open(self.path, 'rb')
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._mmap
+
+    def close(self):
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._file.close()
+                self._mmap = None
+                self._file = None
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_record_index(path: str, separator: str = "") -> RecordIndex:
+    """Return a cached RecordIndex for `path`, reopening it when the file changed."""
+    key = (os.path.abspath(path), separator)
+    st = os.stat(path)
+    signature = (st.st_mtime_ns, st.st_size)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None and index.signature == signature:
+            return index
+        if index is not None:
+            index.close()
+        index = RecordIndex.open(path, separator)
+        _indexes[key] = index
+        return index
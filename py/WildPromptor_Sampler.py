@@ -0,0 +1,62 @@
+import numpy as np
+
+
+class NonRepeatingSampler:
+    """Draw indices 0..size-1 without repetition via a lazy Fisher-Yates shuffle.
+
+    Only the swapped positions of the permutation are stored, so creating a
+    sampler is O(1) and a draw is O(1) regardless of list length. Indices are
+    tracked instead of values, so duplicate lines in a file are still separate
+    entries. When all indices have been drawn the permutation is reset and a new
+    shuffle begins, which means the last item of one cycle can reappear as the
+    first item of the next.
+
+    BatchPlan keeps one sampler per no-duplicate 🎲Random category, all drawing
+    from the plan's `numpy.random.Generator`.
+
+    Determinism: `draw_many(count)` consumes the generator cycle by cycle. A
+    whole cycle taken at once is `rng.permutation(size)`. Otherwise the draws
+    of the cycle's remaining positions k..k+n-1 come from one call,
+    `rng.integers(k..k+n-1, size)`. The output therefore depends only on
+    `size`, the counts requested and the generator state, and the same seed
+    always gives the same sequence.
+    """
+
+    def __init__(self, size: int, rng: np.random.Generator):
+        self.size = size
+        self.rng = rng
+        self.position = 0
+        self.swaps = {}
+
+    def draw(self) -> int:
+        return int(self.draw_many(1)[0])
+
+    def draw_many(self, count: int) -> np.ndarray:
+        out = np.empty(count, dtype=np.int64)
+        filled = 0
+        while filled < count:
+            if self.position >= self.size:
+                self.position = 0
+                self.swaps.clear()
+            take = min(count - filled, self.size - self.position)
+            if take == self.size:
+                # A full cycle is exactly one Fisher-Yates shuffle
+                out[filled:filled + take] = self.rng.permutation(self.size)
+                self.position = self.size
+            else:
+                out[filled:filled + take] = self._lazy_draws(take)
+            filled += take
+        return out
+
+    def _lazy_draws(self, take: int):
+        start = self.position
+        targets = self.rng.integers(np.arange(start, start + take), self.size).tolist()
+        swaps = self.swaps
+        chosen = []
+        for i, j in enumerate(targets, start):
+            chosen.append(swaps.get(j, j))
+            swaps[j] = swaps.get(i, i)
+            # Position i is never looked at again in this cycle
+            swaps.pop(i, None)
+        self.position = start + take
+        return chosen
@@ -0,0 +1,392 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import numpy as np
+from WildPromptor_Wordlist import get_store
+from WildPromptor_Batch import MAX_BATCH_SIZE, LOG_LIMIT
+
+# Compiled templates kept per process (template text -> AST)
+MAX_COMPILED_TEMPLATES = 256
+DEFAULT_SEPARATOR = ", "
+
+_MULTI = re.compile(r"\s*(\d*)\s*(?:-\s*(\d*)\s*)?\$\$(?:([^$|{}]*)\$\$)?")
+_WEIGHT = re.compile(r"\s*(\d+(?:\.\d*)?|\.\d+)\s*::")
+# Names may contain spaces ("__Environment/Weather and Sky__") but not start or end with one
+_WILDCARD = re.compile(r"__([^\s{}|_](?:[^{}|\n]*?[^\s{}|])?)__")
+# `__...__` that is not a valid wildcard; kept as text but reported by check_template
+_UNMATCHED = re.compile(r"__[^_{}|\n]+?__")
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+_SHIFTS = (np.uint64(30), np.uint64(27), np.uint64(31), np.uint64(11))
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer over a uint64 array (wraps modulo 2**64)."""
+    x = x + _GOLDEN
+    x = (x ^ (x >> _SHIFTS[0])) * _MIX1
+    x = (x ^ (x >> _SHIFTS[1])) * _MIX2
+    return x ^ (x >> _SHIFTS[2])
+
+
+def _uniform(keys: np.ndarray, salt: np.uint64) -> np.ndarray:
+    """One float in [0, 1) per key, a pure function of (key, salt)."""
+    return (_mix(keys ^ salt) >> _SHIFTS[3]).astype(np.float64) * (1.0 / (1 << 53))
+
+
+def _join(parts: List[np.ndarray], count: int) -> np.ndarray:
+    out = np.full(count, "", dtype=object)
+    for part in parts:
+        out = out + part
+    return out
+
+
+class Text:
+    __slots__ = ("value",)
+
+    def __init__(self, value: str):
+        self.value = value
+
+    def expand(self, keys, context):
+        return np.full(len(keys), self.value, dtype=object)
+
+    def wildcards(self):
+        return []
+
+
+class Sequence:
+    __slots__ = ("parts",)
+
+    def __init__(self, parts):
+        self.parts = parts
+
+    def expand(self, keys, context):
+        return _join([part.expand(keys, context) for part in self.parts], len(keys))
+
+    def wildcards(self):
+        return [ref for part in self.parts for ref in part.wildcards()]
+
+
+class Wildcard:
+    """`__Folder/Name__` or `__Name__`: one entry of a data/ wordlist.
+
+    Like the list nodes, `title - content` lines expand to their content.
+    """
+    __slots__ = ("ref", "salt")
+
+    def __init__(self, ref: str, salt: np.uint64):
+        self.ref = ref
+        self.salt = salt
+
+    def expand(self, keys, context):
+        lines, sampler = context.lines(self.ref)
+        out = np.full(len(keys), "", dtype=object)
+        if len(lines) and len(keys):
+            u = _uniform(keys, self.salt)
+            if sampler is not None:
+                indices = sampler.from_uniform(u)
+            else:
+                indices = np.minimum((u * len(lines)).astype(np.int64), len(lines) - 1)
+            out[:] = lines.take(indices) if hasattr(lines, "take") else [lines[i] for i in indices.tolist()]
+        return out
+
+    def wildcards(self):
+        return [self.ref]
+
+
+class Choice:
+    """`{a|b|c}`, `{2::a|b}` weights, and `{2$$a|b|c}` / `{1-3$$ and $$a|b|c}` multi-picks.
+
+    A single pick draws one option per row and expands each option once for all
+    the rows that picked it. Multi-picks choose `count` distinct options per row
+    (weighted without replacement, by smallest -log(u)/weight) and join them.
+    """
+    __slots__ = ("options", "weights", "cumulative", "low", "high", "separator", "salt")
+
+    def __init__(self, options, weights, salt, low=1, high=1, separator=DEFAULT_SEPARATOR):
+        self.options = options
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.cumulative = np.cumsum(self.weights)
+        self.low = low
+        self.high = high
+        self.separator = separator
+        self.salt = salt
+
+    def expand(self, keys, context):
+        count = len(keys)
+        if count == 0 or self.cumulative[-1] <= 0:
+            return np.full(count, "", dtype=object)
+        if self.low == 1 and self.high == 1:
+            return self._expand_single(keys, context)
+        return self._expand_multi(keys, context)
+
+    def _expand_single(self, keys, context):
+        picks = np.searchsorted(self.cumulative, _uniform(keys, self.salt) * self.cumulative[-1], side="right")
+        picks = np.minimum(picks, len(self.options) - 1)
+        out = np.empty(len(keys), dtype=object)
+        for index, option in enumerate(self.options):
+            rows = np.flatnonzero(picks == index)
+            if rows.size:
+                out[rows] = option.expand(keys[rows], context)
+        return out
+
+    def _expand_multi(self, keys, context):
+        count = len(keys)
+        available = int(np.count_nonzero(self.weights > 0))
+        high = min(self.high, available)
+        low = min(self.low, high)
+        if high <= 0:
+            return np.full(count, "", dtype=object)
+
+        row_keys = _mix(keys ^ self.salt)
+        sizes = low + np.minimum((_uniform(row_keys, _GOLDEN) * (high - low + 1)).astype(np.int64), high - low)
+        option_keys = row_keys[:, None] ^ np.arange(1, len(self.options) + 1, dtype=np.uint64)[None, :]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = -np.log1p(-_uniform(option_keys, self.salt)) / self.weights
+        picks = np.argsort(scores, axis=1, kind="stable")[:, :high]
+
+        slots = np.full((count, high), "", dtype=object)
+        used = np.arange(high)[None, :] < sizes[:, None]
+        for index, option in enumerate(self.options):
+            rows, columns = np.nonzero((picks == index) & used)
+            if rows.size:
+                # Each slot gets its own key, so an option picked twice never repeats its draws
+                slot_keys = _mix(row_keys[rows] ^ (columns.astype(np.uint64) + _GOLDEN))
+                slots[rows, columns] = option.expand(slot_keys, context)
+        return np.array([self.separator.join(row[:size]) for row, size in zip(slots.tolist(), sizes.tolist())],
+                        dtype=object)
+
+    def wildcards(self):
+        return [ref for option in self.options for ref in option.wildcards()]
+
+
+class Template:
+    """A compiled template. `expand` renders a whole batch in one pass over the AST.
+
+    Prompt i is rendered from seed `seed + i` alone: every random draw is a hash
+    of that row's seed and the drawing node, so a prompt never depends on the
+    batch size or on what the other rows picked.
+    """
+    __slots__ = ("source", "root", "unmatched")
+
+    def __init__(self, source: str, root, unmatched=()):
+        self.source = source
+        self.root = root
+        self.unmatched = list(unmatched)
+
+    def wildcards(self) -> List[str]:
+        return list(OrderedDict.fromkeys(self.root.wildcards()))
+
+    def expand(self, batch_size: int, seed: int = 0) -> List[str]:
+        if batch_size <= 0:
+            return []
+        seeds = np.uint64(seed % (1 << 64)) + np.arange(batch_size, dtype=np.uint64)
+        return self.root.expand(_mix(seeds), WildcardContext()).tolist()
+
+
+class WildcardContext:
+    """Resolves each wildcard once per expansion; lines and weights come from the shared wordlist store."""
+
+    def __init__(self):
+        self._lines = {}
+
+    def lines(self, ref: str):
+        """(contents, alias table or None) for a wildcard reference."""
+        resolved = self._lines.get(ref)
+        if resolved is None:
+            file_path = resolve_wildcard(ref)
+            entry = get_store().get(file_path) if file_path is not None else None
+            if entry is None:
+                raise ValueError(f"Unknown wildcard: __{ref}__")
+            # The same text PromptListNode draws (get_split's contents), weighted by line
+            resolved = self._lines[ref] = (entry.contents, entry.sampler())
+        return resolved
+
+
+def resolve_wildcard(ref: str) -> Optional[str]:
+    """`Folder/Name` -> that list; a bare `Name` -> the first data folder that has it."""
+    store = get_store()
+    if "/" in ref:
+        folder, name = ref.split("/", 1)
+        return store.resolve(folder, name) if folder in store.folder_names() else None
+    for folder in store.folder_names():
+        file_path = store.resolve(folder, ref)
+        if file_path is not None:
+            return file_path
+    return None
+
+
+class TemplateParser:
+    def __init__(self, source: str):
+        self.source = source
+        self.pos = 0
+        self.salts = 0
+        self.unmatched = []
+
+    def error(self, message: str):
+        return ValueError(f"Template error at position {self.pos}: {message}")
+
+    def next_salt(self) -> np.uint64:
+        self.salts += 1
+        return _mix(np.array([self.salts], dtype=np.uint64))[0]
+
+    def parse(self):
+        root = self.sequence(nested=False)
+        if self.pos < len(self.source):
+            raise self.error(f"unexpected '{self.source[self.pos]}'")
+        return root
+
+    def sequence(self, nested: bool):
+        parts = []
+        text = []
+        source = self.source
+        while self.pos < len(source):
+            char = source[self.pos]
+            if nested and char in "|}":
+                break
+            if char == "\\" and self.pos + 1 < len(source):
+                text.append(source[self.pos + 1])
+                self.pos += 2
+                continue
+            if char == "{":
+                self.pos += 1
+                node = self.choice()
+            elif char == "_" and (match := _WILDCARD.match(source, self.pos)):
+                self.pos = match.end()
+                node = Wildcard(match.group(1), self.next_salt())
+            elif char == "_" and (match := _UNMATCHED.match(source, self.pos)):
+                self.unmatched.append(match.group(0))
+                text.append(match.group(0))
+                self.pos = match.end()
+                continue
+            else:
+                text.append(char)
+                self.pos += 1
+                continue
+            if text:
+                parts.append(Text("".join(text)))
+                text = []
+            parts.append(node)
+        if text:
+            parts.append(Text("".join(text)))
+        if len(parts) == 1:
+            return parts[0]
+        return Sequence(parts) if parts else Text("")
+
+    def choice(self):
+        low = high = 1
+        separator = DEFAULT_SEPARATOR
+        match = _MULTI.match(self.source, self.pos)
+        if match:
+            low_text, high_text, separator_text = match.groups()
+            if "-" in match.group(0).split("$$", 1)[0]:
+                low = int(low_text) if low_text else 1
+                high = int(high_text) if high_text else None
+            else:
+                low = high = int(low_text) if low_text else 1
+            if separator_text is not None:
+                separator = separator_text
+            self.pos = match.end()
+
+        options = []
+        weights = []
+        while True:
+            weight = _WEIGHT.match(self.source, self.pos)
+            if weight:
+                weights.append(float(weight.group(1)))
+                self.pos = weight.end()
+            else:
+                weights.append(1.0)
+            options.append(self.sequence(nested=True))
+            if self.pos >= len(self.source):
+                raise self.error("missing '}'")
+            char = self.source[self.pos]
+            self.pos += 1
+            if char == "}":
+                break
+
+        if high is None:
+            high = len(options)
+        if low > high:
+            raise self.error(f"pick range {low}-{high} is empty")
+        return Choice(options, weights, self.next_salt(), low, high, separator)
+
+
+_compiled = OrderedDict()
+_compiled_lock = threading.Lock()
+
+
+def compile_template(source: str) -> Template:
+    """Parse `source` once; later calls with the same text return the cached Template."""
+    with _compiled_lock:
+        template = _compiled.get(source)
+        if template is not None:
+            _compiled.move_to_end(source)
+            return template
+    parser = TemplateParser(source)
+    template = Template(source, parser.parse(), parser.unmatched)
+    with _compiled_lock:
+        _compiled[source] = template
+        while len(_compiled) > MAX_COMPILED_TEMPLATES:
+            _compiled.popitem(last=False)
+    return template
+
+
+def check_template(source: str):
+    """Compile a template and resolve its wildcards. Returns True or an error message."""
+    try:
+        template = compile_template(source)
+    except ValueError as e:
+        return str(e)
+    if template.unmatched:
+        return "Not a valid wildcard: " + ", ".join(template.unmatched)
+    missing = [ref for ref in template.wildcards() if resolve_wildcard(ref) is None]
+    if missing:
+        return "Unknown wildcard: " + ", ".join(f"__{ref}__" for ref in missing)
+    return True
+
+
+class WildPromptor_Template:
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("prompt",)
+    FUNCTION = "process_template"
+    OUTPUT_IS_LIST = (True,)
+    CATEGORY = "🧪AILab/🧿WildPromptor"
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "template": ("STRING", {"multiline": True, "default": "__Subject/Female__, {red|blue|green} dress, {2$$__Styles/lighting_Styles__|soft focus|film grain}"}),
+                "batch_size": ("INT", {"default": 1, "min": 1, "max": MAX_BATCH_SIZE}),
+                "seed": ("INT", {"default": 0, "min": 0, "max": 0xffffffffffffffff}),
+            },
+        }
+
+    @classmethod
+    def VALIDATE_INPUTS(cls, template=None, **kwargs):
+        # A linked template is only known at run time
+        if template is None:
+            return True
+        return check_template(template)
+
+    def process_template(self, template: str, batch_size: int, seed: int) -> Tuple[List[str]]:
+        all_prompts = compile_template(template).expand(batch_size, seed)
+
+        for prompt in all_prompts[:LOG_LIMIT]:
+            print(f"🧩 WildPromptor Template output: {prompt}")
+        if len(all_prompts) > LOG_LIMIT:
+            print(f"🧩 WildPromptor Template: {len(all_prompts) - LOG_LIMIT} more prompts not shown")
+
+        return (all_prompts,)
+
+
+NODE_CLASS_MAPPINGS = {
+    "WildPromptor_Template": WildPromptor_Template,
+}
+
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "WildPromptor_Template": "Wildcard Template 🧩",
+}
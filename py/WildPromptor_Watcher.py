@@ -0,0 +1,174 @@
+import os
+import threading
+from typing import Callable, Dict, Set, Tuple
+from WildPromptor_Wordlist import get_store, get_config
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+
+try:
+    from server import PromptServer
+except ImportError:
+    PromptServer = None
+
+CHANGE_EVENT = "wildpromptor.wordlists_changed"
+DEFAULT_INTERVAL = 2.0
+
+_listeners = []
+
+
+def add_listener(listener: Callable[[Set[str], Set[str], Set[str]], None]):
+    """Call `listener(changed_files, added_folders, removed_folders)` after each batch of changes."""
+    _listeners.append(listener)
+
+
+class WordlistWatcher:
+    """Keeps the wordlist store and the frontend's option lists in step with data/.
+
+    Uses inotify (through the optional `watchdog` package) when available and
+    otherwise polls file signatures every `interval` seconds. Either way, only
+    the files that changed are refreshed in the store; nothing is rescanned in
+    full. Each batch of changes is announced to listeners and to the frontend,
+    which refreshes its combo lists in place.
+    """
+
+    def __init__(self, store, interval: float = DEFAULT_INTERVAL, backend: str = "auto"):
+        self.store = store
+        self.interval = max(0.1, float(interval))
+        self.backend = "inotify" if backend in ("auto", "inotify") and Observer is not None else "polling"
+        self._snapshot = {}
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._observer = None
+
+    def scan(self) -> Dict[str, Dict[str, Tuple[int, int]]]:
+        """{folder: {filename: signature}} for every .txt file under the data path."""
+        snapshot = {}
+        for folder in self.store.folder_names():
+            files = {}
+            try:
+                with os.scandir(os.path.join(self.store.data_path, folder)) as entries:
+                    for entry in entries:
+                        if entry.name.endswith('.txt') and entry.is_file():
+                            stat = entry.stat()
+                            files[entry.name] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+            snapshot[folder] = files
+        return snapshot
+
+    def diff(self, old, new) -> Tuple[Set[str], Set[str], Set[str]]:
+        added_folders = set(new) - set(old)
+        removed_folders = set(old) - set(new)
+        changed = set()
+        for folder in set(old) | set(new):
+            old_files, new_files = old.get(folder, {}), new.get(folder, {})
+            for name in set(old_files) | set(new_files):
+                if old_files.get(name) != new_files.get(name):
+                    changed.add(os.path.join(self.store.data_path, folder, name))
+        return changed, added_folders, removed_folders
+
+    def apply(self, changed: Set[str], added_folders: Set[str], removed_folders: Set[str]):
+        if not (changed or added_folders or removed_folders):
+            return
+        for path in changed:
+            self.store.refresh(path)
+        for folder in added_folders | removed_folders:
+            self.store.folder_index(folder)
+        for listener in list(_listeners):
+            try:
+                listener(changed, added_folders, removed_folders)
+            except Exception as e:
+                print(f"[Watcher] Listener failed: {e}")
+        if PromptServer is not None and getattr(PromptServer, "instance", None) is not None:
+            folders = {os.path.basename(os.path.dirname(path)) for path in changed} | added_folders | removed_folders
+            PromptServer.instance.send_sync(CHANGE_EVENT, {"folders": sorted(folders)})
+
+    def _poll(self):
+        while not self._stop.wait(self.interval):
+            snapshot = self.scan()
+            changes = self.diff(self._snapshot, snapshot)
+            self._snapshot = snapshot
+            self.apply(*changes)
+
+    def _drain_events(self):
+        data_path = os.path.abspath(self.store.data_path)
+        while not self._stop.is_set():
+            self._wake.wait()
+            # Let bursts (editor save, bulk copy) settle into one batch
+            self._stop.wait(min(self.interval, 0.5))
+            self._wake.clear()
+            with self._pending_lock:
+                paths, self._pending = self._pending, set()
+
+            changed, added_folders, removed_folders = set(), set(), set()
+            for path in paths:
+                relative = os.path.relpath(path, data_path).split(os.sep)
+                if relative[0] == '.' or relative[0].startswith('..'):
+                    continue
+                if len(relative) == 1:
+                    (added_folders if os.path.isdir(path) else removed_folders).add(relative[0])
+                elif len(relative) == 2 and path.endswith('.txt'):
+                    changed.add(path)
+            self.apply(changed, added_folders, removed_folders)
+
+    def _on_event(self, event):
+        paths = [event.src_path, getattr(event, "dest_path", None)]
+        with self._pending_lock:
+            self._pending.update(os.path.abspath(p) for p in paths if p)
+        self._wake.set()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        if self.backend == "inotify":
+            watcher = self
+
+            class Handler(FileSystemEventHandler):
+                def on_any_event(self, event):
+                    watcher._on_event(event)
+
+            self._observer = Observer()
+            self._observer.schedule(Handler(), self.store.data_path, recursive=True)
+            self._observer.daemon = True
+            self._observer.start()
+            target = self._drain_events
+        else:
+            self._snapshot = self.scan()
+            target = self._poll
+        self._thread = threading.Thread(target=target, name="WildPromptor-watcher", daemon=True)
+        self._thread.start()
+        print(f"[Watcher] Watching {self.store.data_path} ({self.backend})")
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+
+
+_watcher = None
+
+
+def start_watcher():
+    """Start the shared watcher if config.json "watch" enables it."""
+    global _watcher
+    settings = get_config().get('watch', {})
+    if _watcher is not None or not settings.get('enabled', True):
+        return _watcher
+    store = get_store()
+    if not os.path.isdir(store.data_path):
+        return None
+    _watcher = WordlistWatcher(store, settings.get('interval', DEFAULT_INTERVAL), settings.get('backend', 'auto'))
+    _watcher.start()
+    return _watcher
+
+
+if PromptServer is not None and getattr(PromptServer, "instance", None) is not None:
+    start_watcher()
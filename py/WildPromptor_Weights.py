@@ -0,0 +1,131 @@
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# `a line of text :: 3.0` gives that line three times the default weight of 1
+_WEIGHT_SUFFIX = re.compile(r"\s*::\s*(\d+(?:\.\d*)?|\.\d+)$")
+WEIGHTS_EXTENSION = ".weights"
+
+
+def split_weight(line: str) -> Tuple[str, Optional[float]]:
+    """`text :: 3.0` -> ("text", 3.0); lines without a weight suffix -> (line, None)."""
+    match = _WEIGHT_SUFFIX.search(line)
+    if match is None or match.start() == 0:
+        return line, None
+    return line[:match.start()], float(match.group(1))
+
+
+def split_weights(lines: List[str]) -> Tuple[List[str], Optional[np.ndarray]]:
+    """Strip weight suffixes from a file's lines. Weights are None when no line has one."""
+    if not any('::' in line for line in lines):
+        return lines, None
+    texts = []
+    weights = np.ones(len(lines), dtype=np.float64)
+    for i, line in enumerate(lines):
+        text, weight = split_weight(line)
+        texts.append(text)
+        if weight is not None:
+            weights[i] = weight
+    return texts, weights
+
+
+def weights_path(file_path: str) -> str:
+    """Sidecar weights file for a list: `1_1.Char.txt` -> `1_1.Char.weights`."""
+    return os.path.splitext(file_path)[0] + WEIGHTS_EXTENSION
+
+
+def weights_signature(file_path: str) -> tuple:
+    """Stat signature of the sidecar weights file, () if there is none."""
+    try:
+        st = os.stat(weights_path(file_path))
+    except OSError:
+        return ()
+    return (st.st_mtime_ns, st.st_size)
+
+
+def read_weights_file(file_path: str) -> Dict[str, float]:
+    """Sidecar entries, one `line or title :: weight` per line."""
+    table = {}
+    try:
+        with open(weights_path(file_path), 'r', encoding='utf-8') as f:
+            for line in f:
+                text, weight = split_weight(line.strip())
+                if weight is not None:
+                    table[text] = weight
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Error reading weights for {file_path}: {e}")
+    return table
+
+
+def apply_weights_file(file_path: str, lines, titles, weights: Optional[np.ndarray]) -> Optional[np.ndarray]:
+    """Override line weights with the sidecar file, matching a line by its text or its title."""
+    table = read_weights_file(file_path)
+    if not table:
+        return weights
+    weights = np.ones(len(lines), dtype=np.float64) if weights is None else np.array(weights, dtype=np.float64)
+    for i, (line, title) in enumerate(zip(lines, titles)):
+        weight = table.get(line, table.get(title))
+        if weight is not None:
+            weights[i] = weight
+    return weights
+
+
+class AliasTable:
+    """Vose alias table over one list's weights: O(n) to build, O(1) per draw.
+
+    Each slot i holds a probability `prob[i]` and a fallback `alias[i]`. A draw
+    picks a slot uniformly and keeps it with probability `prob[i]`, otherwise
+    takes its alias, so weighted draws cost the same as uniform ones. Lines with
+    weight 0 are never drawn. If every weight is 0 the table is uniform.
+    """
+    __slots__ = ("weights", "prob", "alias", "size")
+
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        size = len(weights)
+        if size == 0:
+            raise ValueError("Cannot build an alias table for an empty list")
+        weights = np.where(np.isfinite(weights) & (weights > 0), weights, 0.0)
+        total = weights.sum()
+        if total <= 0:
+            weights = np.ones(size, dtype=np.float64)
+            total = float(size)
+
+        scaled = (weights * (size / total)).tolist()
+        prob = np.ones(size, dtype=np.float64)
+        alias = np.arange(size, dtype=np.int64)
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            prob[less] = scaled[less]
+            alias[less] = more
+            scaled[more] = (scaled[more] + scaled[less]) - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Whatever is left is 1 up to rounding error and keeps prob 1
+
+        self.weights = weights
+        self.prob = prob
+        self.alias = alias
+        self.size = size
+
+    def from_uniform(self, u: np.ndarray) -> np.ndarray:
+        """Indices for an array of floats in [0, 1): one uniform per draw picks the slot and the coin."""
+        scaled = np.asarray(u, dtype=np.float64) * self.size
+        slots = np.minimum(scaled.astype(np.int64), self.size - 1)
+        return np.where(scaled - slots < self.prob[slots], slots, self.alias[slots])
+
+    def sample(self, rng: np.random.Generator, count: int) -> np.ndarray:
+        return self.from_uniform(rng.random(count))
+
+    def order(self, rng: np.random.Generator) -> np.ndarray:
+        """A weighted random order of the drawable lines (heavier lines tend to come first).
+
+        Sorting by exponential(1) / weight draws without replacement in proportion
+        to the weights. Used when duplicates are not allowed.
+        """
+        candidates = np.flatnonzero(self.weights > 0)
+        keys = rng.exponential(size=candidates.size) / self.weights[candidates]
+        return candidates[np.argsort(keys, kind="stable")]
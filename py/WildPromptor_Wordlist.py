@@ -0,0 +1,376 @@
+import os
+import sys
+import json
+import threading
+from collections import OrderedDict
+from typing import Tuple, List, Dict, Any, Optional
+import numpy as np
+from WildPromptor_Pack import get_pack
+from WildPromptor_Weights import AliasTable, split_weights, weights_signature, apply_weights_file
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MAX_MEMORY_MB = 256
+
+
+class WordlistEntry:
+    """Parsed contents of one wordlist file plus the stat signature it was read with.
+
+    The columns are lists for files parsed from .txt, or PackedColumn views when
+    the file was served from a compiled pack (see WildPromptor_Pack). `weights`
+    is None when every line has the default weight; the alias table for weighted
+    draws is built on first use and kept with the entry.
+    """
+    __slots__ = ("path", "signature", "lines", "titles", "contents", "weights", "alias", "nbytes")
+
+    def __init__(self, path, signature, lines, titles=None, contents=None, weights=None):
+        self.path = path
+        self.signature = signature
+        self.lines = lines
+        if titles is None:
+            titles, contents = split_titles(lines)
+        self.titles, self.contents = titles, contents
+        self.weights = weights
+        self.alias = None
+        self.nbytes = estimate_size(self)
+
+    def sampler(self) -> Optional[AliasTable]:
+        """Alias table for weighted draws, or None when the list is unweighted."""
+        if self.weights is None or not len(self.lines):
+            return None
+        if self.alias is None:
+            self.alias = AliasTable(self.weights)
+        return self.alias
+
+
+def split_titles(lines: List[str]) -> Tuple[List[str], List[str]]:
+    """Split `title - content` lines. Files without any title share one list for both."""
+    if not any(' - ' in line for line in lines):
+        return lines, lines
+    titles = []
+    contents = []
+    for line in lines:
+        if ' - ' in line:
+            title, content = line.split(' - ', 1)
+            titles.append(title)
+            contents.append(content)
+        else:
+            titles.append(line)
+            contents.append(line)
+    return titles, contents
+
+
+def estimate_size(entry: WordlistEntry) -> int:
+    # Weights plus the alias table's prob and alias arrays
+    size = entry.weights.nbytes * 3 if entry.weights is not None else 0
+    if not isinstance(entry.lines, list):
+        # Packed columns decode on demand; their text lives in the shared memory map
+        return size + sys.getsizeof(entry.lines) * 3
+    size += sys.getsizeof(entry.lines) + sum(sys.getsizeof(s) for s in entry.lines)
+    if entry.titles is not entry.lines:
+        size += sys.getsizeof(entry.titles) + sys.getsizeof(entry.contents)
+        size += sum(sys.getsizeof(s) for s in entry.titles) + sum(sys.getsizeof(s) for s in entry.contents)
+    return size
+
+
+def clean_name(filename: str) -> str:
+    """`1_1.Female.txt` -> `Female`, the name shown on node widgets."""
+    original_name = os.path.splitext(filename)[0]
+    return original_name.split('.', 1)[-1] if '.' in original_name else original_name
+
+
+def widget_name(key: str) -> str:
+    """Strip the ` [count]` suffix from a widget key."""
+    return key.split(' [')[0]
+
+
+def file_signature(path: str):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def load_config() -> Dict[str, Any]:
+    config_path = os.path.join(BASE_PATH, 'config.json')
+    try:
+        with open(config_path, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading config {config_path}: {e}")
+        return {"data_path": "data", "folders": []}
+
+
+_config = None
+
+
+def get_config() -> Dict[str, Any]:
+    """config.json, read once per process."""
+    global _config
+    if _config is None:
+        _config = load_config()
+    return _config
+
+
+def all_in_one_folders() -> List[str]:
+    """Folders shown by the All-in-One nodes: config.json "folders" plus the custom list folder."""
+    config = get_config()
+    folders = list(config.get('folders', []))
+    custom_folder = config.get('custom_folder', 'Custom')
+    if custom_folder and custom_folder not in folders:
+        folders.append(custom_folder)
+    return folders
+
+
+def count_lines(path: str) -> int:
+    """Count non-empty lines without building a list of strings."""
+    with open(path, 'rb') as f:
+        return sum(1 for line in f if line.strip())
+
+
+class FolderIndex:
+    """Exact display name -> filename mapping for one data folder."""
+    __slots__ = ("path", "mtime", "file_names", "by_name")
+
+    def __init__(self, path, mtime, file_names):
+        self.path = path
+        self.mtime = mtime
+        self.file_names = file_names
+        self.by_name = {}
+        for filename in file_names:
+            # First file wins when two files clean to the same name, as they would share a widget
+            self.by_name.setdefault(clean_name(filename), filename)
+
+
+class WordlistStore:
+    """Process-wide cache of parsed wordlist files.
+
+    Every access re-stats the file and reparses it when mtime or size changed, so
+    edits made on disk (e.g. through CustomListManager) are picked up without a
+    restart. Entries are kept in LRU order and evicted once the estimated memory
+    use exceeds `max_memory_mb`.
+
+    It also keeps a per-folder index from widget names to files, refreshed when
+    the folder's mtime changes, so nodes never scan directories to find a file.
+
+    All cache state is guarded by one lock, so the store can be shared by node
+    calls running on different threads. Returned lists must be treated as
+    read-only.
+    """
+
+    def __init__(self, data_path: str, max_memory_mb: float = DEFAULT_MAX_MEMORY_MB, use_packs: bool = True):
+        self.data_path = data_path
+        self.use_packs = use_packs
+        self.max_bytes = int(max_memory_mb * 1024 * 1024)
+        self._entries = OrderedDict()
+        self._folders = {}
+        self._counts = {}
+        self._lock = threading.RLock()
+        self.memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.evictions = 0
+
+    def get(self, file_path: str):
+        """Return the WordlistEntry for `file_path`, or None if it cannot be read.
+
+        Lines may end in a `:: weight` suffix, which is stripped; a sidecar
+        `.weights` file next to the list overrides weights by line or title.
+        """
+        path = os.path.abspath(file_path)
+        try:
+            signature = file_signature(path) + weights_signature(path)
+        except FileNotFoundError:
+            print(f"File not found: {file_path}")
+            self.invalidate(path)
+            return None
+        except OSError as e:
+            print(f"Error reading file {file_path}: {str(e)}")
+            return None
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry
+            if entry is None:
+                self.misses += 1
+            else:
+                self.reloads += 1
+
+            columns = self._packed_columns(path, signature[:2])
+            if columns is None:
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        lines = [line.strip() for line in f if line.strip()]
+                except Exception as e:
+                    print(f"Error reading file {file_path}: {str(e)}")
+                    self._discard(path)
+                    return None
+                lines, weights = split_weights(lines)
+                columns = (lines, *split_titles(lines), weights)
+            elif columns[3] is not None:
+                # Copy out of the map so the entry doesn't pin the pack's buffer
+                columns = columns[:3] + (np.array(columns[3], dtype=np.float64),)
+            if len(signature) > 2:
+                columns = columns[:3] + (apply_weights_file(path, columns[0], columns[1], columns[3]),)
+
+            self._discard(path)
+            entry = WordlistEntry(path, signature, *columns)
+            self._entries[path] = entry
+            self.memory_bytes += entry.nbytes
+            self._evict()
+            return entry
+
+    def _packed_columns(self, path, signature):
+        """(lines, titles, contents, weights) from the folder's pack if it is current for this file."""
+        if not self.use_packs:
+            return None
+        pack = get_pack(os.path.dirname(path))
+        return pack.entry(os.path.basename(path), signature) if pack is not None else None
+
+    def get_lines(self, file_path: str) -> List[str]:
+        entry = self.get(file_path)
+        return entry.lines if entry is not None else []
+
+    def get_split(self, file_path: str) -> Tuple[List[str], List[str]]:
+        entry = self.get(file_path)
+        return (entry.titles, entry.contents) if entry is not None else ([], [])
+
+    def get_sampler(self, file_path: str) -> Optional[AliasTable]:
+        """Alias table for a weighted list, None for unweighted or unreadable ones."""
+        entry = self.get(file_path)
+        return entry.sampler() if entry is not None else None
+
+    def count(self, file_path: str) -> int:
+        """Number of entries in a file, without parsing it if it isn't cached yet."""
+        path = os.path.abspath(file_path)
+        try:
+            signature = file_signature(path)
+        except OSError:
+            return 0
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.signature[:2] == signature:
+                return len(entry.lines)
+            cached = self._counts.get(path)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+        columns = self._packed_columns(path, signature)
+        if columns is not None:
+            return len(columns[0])
+        try:
+            count = count_lines(path)
+        except OSError as e:
+            print(f"Error reading file {file_path}: {str(e)}")
+            return 0
+        with self._lock:
+            self._counts[path] = (signature, count)
+        return count
+
+    def folder_names(self) -> List[str]:
+        if not os.path.isdir(self.data_path):
+            return []
+        return sorted(f for f in os.listdir(self.data_path)
+                      if os.path.isdir(os.path.join(self.data_path, f)) and f != '__pycache__')
+
+    def folder_index(self, folder: str):
+        """Return the FolderIndex for `folder`, rebuilding it if the directory changed."""
+        folder_path = os.path.join(self.data_path, folder)
+        try:
+            mtime = os.stat(folder_path).st_mtime_ns
+        except OSError:
+            with self._lock:
+                self._folders.pop(folder, None)
+            return None
+
+        with self._lock:
+            index = self._folders.get(folder)
+            if index is None or index.mtime != mtime:
+                file_names = sorted(f for f in os.listdir(folder_path) if f.endswith('.txt'))
+                index = FolderIndex(folder_path, mtime, file_names)
+                self._folders[folder] = index
+            return index
+
+    def list_files(self, folder: str) -> List[str]:
+        index = self.folder_index(folder)
+        return list(index.file_names) if index is not None else []
+
+    def resolve(self, folder: str, key: str):
+        """Map a widget key such as `Female [42]` in `folder` to its file path, or None."""
+        index = self.folder_index(folder)
+        if index is None:
+            return None
+        filename = index.by_name.get(widget_name(key))
+        return os.path.join(index.path, filename) if filename is not None else None
+
+    def refresh(self, file_path: str):
+        """Bring one file up to date after it changed on disk.
+
+        A cached file is reparsed right away, so the next node run finds it warm;
+        one that was only counted is recounted lazily. Other files are untouched.
+        """
+        path = os.path.abspath(file_path)
+        with self._lock:
+            cached = path in self._entries
+            self._counts.pop(path, None)
+        if not os.path.exists(path):
+            self.invalidate(path)
+        elif cached:
+            self.get(path)
+        self.folder_index(os.path.basename(os.path.dirname(path)))
+
+    def invalidate(self, file_path: str = None):
+        """Drop one file (or everything when no path is given) from the cache."""
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+                self._folders.clear()
+                self._counts.clear()
+                self.memory_bytes = 0
+            else:
+                self._discard(os.path.abspath(file_path))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.reloads
+            return {
+                "files": len(self._entries),
+                "memory_mb": round(self.memory_bytes / (1024 * 1024), 2),
+                "max_memory_mb": round(self.max_bytes / (1024 * 1024), 2),
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _discard(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self.memory_bytes -= entry.nbytes
+
+    def _evict(self):
+        # Always keep the most recently used entry, even if it alone exceeds the budget.
+        while self.memory_bytes > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self.memory_bytes -= entry.nbytes
+            self.evictions += 1
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> WordlistStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                config = get_config()
+                store = WordlistStore(os.path.join(BASE_PATH, config.get('data_path', 'data')),
+                                      config.get('wordlist_cache_mb', DEFAULT_MAX_MEMORY_MB),
+                                      config.get('use_packs', True))
+                for folder in store.folder_names():
+                    store.folder_index(folder)
+                _store = store
+    return _store
@@ -1,5 +1,14 @@
 import random
 import re
+from bisect import bisect_right
+from collections import deque
+from itertools import islice
+from WildPromptor_RecordIndex import get_record_index, clean_line
+
+# Read size used when streaming files with a custom separator
+STREAM_CHUNK_SIZE = 1 << 20
+# The line boundaries of str.splitlines()
+LINE_BREAK = re.compile("\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
 
 class WildPromptor_DataToPromptList: 
     def __init__(self):
@@ -19,6 +28,8 @@ class WildPromptor_DataToPromptList:
             },
             "optional": {
                 "path": ("STRING", {"forceInput": True, "multiline": True, "tooltip": "File path input, will be processed along with text input"}),
+                "streaming": ("BOOLEAN", {"default": False, "tooltip": "Read files lazily so memory scales with batch_size instead of file size. Random mode uses reservoir sampling, so it picks a different order than non-streaming mode for the same seed"}),
+                "use_index": ("BOOLEAN", {"default": False, "tooltip": "Build and reuse a <file>.idx record offset index next to each file, so any mode and start position reads only the records it returns. Takes precedence over streaming"}),
             }
         }
 
@@ -33,7 +44,7 @@ class WildPromptor_DataToPromptList:
         if separator == "":
             segments = []
             for line in text.splitlines():
-                line = line.rstrip(',').strip()
+                line = clean_line(line)
                 if line:
                     segments.append(line)
         else:
@@ -78,11 +89,149 @@ class WildPromptor_DataToPromptList:
 
         return data
 
-    def generate_prompts(self, path, batch_size=1, count_start_from=1, seed=0, 
-                        allow_duplicates=True, mode="⬇️Sequential", separator="", text=None):
+    def _iter_file_records(self, file_path, separator):
+        """Yield cleaned records from a file without loading it whole."""
+        if separator == "":
+            # Same boundaries as str.splitlines, which the other paths use
+            pattern, overlap, clean = LINE_BREAK, 0, clean_line
+        else:
+            pattern, overlap, clean = re.compile(re.escape(separator)), len(separator) - 1, str.strip
+
+        with open(file_path, 'r', encoding='utf-8') as f:
+            buffer = ""
+            scan = 0
+            while True:
+                chunk = f.read(STREAM_CHUNK_SIZE)
+                buffer += chunk
+                start = 0
+                while True:
+                    match = pattern.search(buffer, scan)
+                    # A match touching the end may still grow with the next chunk ('\r' + '\n')
+                    if match is None or (chunk and match.end() == len(buffer)):
+                        break
+                    segment = clean(buffer[start:match.start()])
+                    if segment:
+                        yield segment
+                    start = scan = match.end()
+                if not chunk:
+                    segment = clean(buffer[start:])
+                    if segment:
+                        yield segment
+                    return
+                # Only the unscanned tail is searched next time, so one huge record stays linear
+                scan = (match.start() if match is not None else max(start, len(buffer) - overlap)) - start
+                buffer = buffer[start:]
+
+    def _iter_records(self, path, separator, text):
+        """Yield records from text input, then from each file, lazily."""
+        if text:
+            yield from self._split_and_clean(text, separator)
+
+        if path:
+            for file_path in self._process_file_paths(path):
+                if file_path:
+                    try:
+                        yield from self._iter_file_records(file_path, separator)
+                    except (FileNotFoundError, IOError) as e:
+                        print(f"Error reading file {file_path}: {e}")
+
+    def _stream_prompts(self, records, batch_size, start_index, mode, rng):
+        """Select records in one pass, holding at most start_index + batch_size of them.
+
+        Returns (selected, total_seen). With batch_size 0 every record is kept.
+        """
+        total = 0
+        if mode == "⬇️Sequential":
+            if batch_size == 0:
+                selected = list(islice(records, start_index, None))
+                return selected, start_index + len(selected)
+            selected = []
+            for total, record in enumerate(records, 1):
+                if total > start_index:
+                    selected.append(record)
+                    if len(selected) >= batch_size:
+                        break
+            return selected, total
+
+        if mode == "⬆️Reverse":
+            tail = deque(maxlen=start_index + batch_size if batch_size else None)
+            for total, record in enumerate(records, 1):
+                tail.append(record)
+            selected = list(reversed(tail))[start_index:]
+            return selected, total
+
+        # Random: reservoir sample (Algorithm R), then shuffle the sample
+        keep = start_index + batch_size if batch_size else None
+        reservoir = []
+        for total, record in enumerate(records, 1):
+            if keep is None or len(reservoir) < keep:
+                reservoir.append(record)
+            else:
+                j = rng.randrange(total)
+                if j < keep:
+                    reservoir[j] = record
+        rng.shuffle(reservoir)
+        return reservoir[start_index:], total
+
+    def _indexed_prompts(self, path, separator, text, batch_size, start_index, mode, rng):
+        """Select records through per-file offset indexes, reading only the chosen ones.
+
+        Returns (selected, total) like _stream_prompts.
+        """
+        sources = []
+        if text:
+            sources.append(self._split_and_clean(text, separator))
+        if path:
+            for file_path in self._process_file_paths(path):
+                if file_path:
+                    try:
+                        sources.append(get_record_index(file_path, separator))
+                    except (FileNotFoundError, IOError) as e:
+                        print(f"Error reading file {file_path}: {e}")
+
+        starts = []
+        total = 0
+        for source in sources:
+            starts.append(total)
+            total += len(source)
+
+        def fetch(i):
+            source_id = bisect_right(starts, i) - 1
+            source = sources[source_id]
+            local = i - starts[source_id]
+            return source[local] if isinstance(source, list) else source.record(local)
+
+        stop = total if batch_size == 0 else min(total, start_index + batch_size)
+        if mode == "⬇️Sequential":
+            indices = range(start_index, stop)
+        elif mode == "⬆️Reverse":
+            indices = range(total - 1 - start_index, total - 1 - stop, -1)
+        else:
+            indices = rng.sample(range(total), stop)[start_index:] if stop > start_index else []
+        return [fetch(i) for i in indices], total
+
+    def generate_prompts(self, path=None, batch_size=1, count_start_from=1, seed=0, 
+                        allow_duplicates=True, mode="⬇️Sequential", separator="", text=None, streaming=False, use_index=False):
         """Generate prompts based on input parameters."""
-        random.seed(seed)
-        
+        # Per-call RNG so concurrent calls don't share or clobber global random state
+        rng = random.Random(seed)
+
+        if streaming or use_index:
+            if use_index:
+                selected, total = self._indexed_prompts(path, separator, text, batch_size, count_start_from - 1, mode, rng)
+            else:
+                records = self._iter_records(path, separator, text)
+                selected, total = self._stream_prompts(records, batch_size, count_start_from - 1, mode, rng)
+            if not total:
+                return (["No data available"], "No data available")
+            if batch_size == 0:
+                batch_size = total
+            prompts = selected
+            if allow_duplicates and selected and batch_size > len(selected):
+                # Same wrap-around as the non-streaming path
+                prompts = [selected[i % len(selected)] for i in range(batch_size)]
+            return (prompts, "\n\n".join(prompts),)
+
         # Read and process data
         data = self._read_data(path, separator, text)
         
@@ -100,7 +249,7 @@ class WildPromptor_DataToPromptList:
         if mode == "⬆️Reverse":
             data = data[::-1]
         elif mode == "🎲Random":
-            random.shuffle(data)
+            rng.shuffle(data)
 
         # Generate prompts
         prompts = []
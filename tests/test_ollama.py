@@ -0,0 +1,80 @@
+import os
+import sys
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "AI"))
+
+import WildPromptor_Ollama as ollama  # noqa: E402
+
+
+class StubOllama(BaseHTTPRequestHandler):
+    """Just enough of the Ollama API: /api/tags and a streaming /api/generate."""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.requests.append(("GET", self.path, None))
+        models = [{"name": "zeta:latest"}, {"name": "alpha:7b"}]
+        self.send_body(json.dumps({"models": models}).encode(), "application/json")
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(("POST", self.path, payload))
+        if payload["prompt"] == "fail":
+            messages = [{"response": "par"}, {"error": "model not found"}]
+        else:
+            messages = [{"response": word} for word in ("a ", "red ", "fox")] + [{"response": "", "done": True}]
+        body = b"".join(json.dumps(m).encode() + b"\n" for m in messages)
+        self.send_body(body, "application/x-ndjson")
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubOllama)
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    ollama._model_lists.clear()
+    yield httpd, f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_list_models_sorted_and_cached(server):
+    httpd, url = server
+    assert ollama.list_models(url + "/") == ["alpha:7b", "zeta:latest"]
+    assert ollama.list_models(url) == ["alpha:7b", "zeta:latest"]
+    assert [r[:2] for r in httpd.requests] == [("GET", "/api/tags")]
+
+    ollama.list_models(url, refresh=True)
+    assert len(httpd.requests) == 2
+
+
+def test_generate_streams_text(server):
+    httpd, url = server
+    updates = []
+    text = ollama.generate(url, {"model": "alpha:7b", "prompt": "fox"}, updates.append)
+    assert text == "a red fox"
+    assert updates == ["a ", "a red ", "a red fox", "a red fox"]
+    method, path, payload = httpd.requests[0]
+    assert (method, path) == ("POST", "/api/generate")
+    assert payload["stream"] is True
+
+
+def test_generate_reports_server_error(server):
+    _, url = server
+    with pytest.raises(RuntimeError, match="model not found"):
+        ollama.generate(url, {"model": "alpha:7b", "prompt": "fail"})
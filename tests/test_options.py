@@ -0,0 +1,15 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "py"))
+
+from WildPromptor_Batch import MAX_BATCH_SIZE  # noqa: E402
+from WildPromptor_Options import BATCH_WIDGETS, validate_widgets  # noqa: E402
+
+
+def test_batch_widgets_are_range_checked():
+    assert validate_widgets({"batch_size": 4, "seed": 7}, BATCH_WIDGETS) is True
+    assert validate_widgets({"batch_size": None}, BATCH_WIDGETS) is True
+    assert "smaller than min" in validate_widgets({"batch_size": 0}, BATCH_WIDGETS)
+    assert "bigger than max" in validate_widgets({"batch_size": MAX_BATCH_SIZE + 1}, BATCH_WIDGETS)
+    assert "failed to convert" in validate_widgets({"seed": "abc"}, BATCH_WIDGETS)
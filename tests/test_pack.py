@@ -0,0 +1,47 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "py"))
+
+import WildPromptor_Pack as packs  # noqa: E402
+
+
+def build(tmp_path):
+    (tmp_path / "1_1.Colors.txt").write_text("Red - a red dress\nBlue :: 2\n", encoding="utf-8")
+    return packs.build_pack(str(tmp_path))[0]
+
+
+def test_pack_round_trip(tmp_path):
+    pack = packs.WordlistPack(build(tmp_path))
+    signature = next(iter(pack.files.values()))[0]
+    lines, titles, contents, weights = pack.entry("1_1.Colors.txt", signature)
+    assert list(lines) == ["Red - a red dress", "Blue"]
+    assert list(titles) == ["Red", "Blue"]
+    assert list(contents) == ["a red dress", "Blue"]
+    assert list(weights) == [1.0, 2.0]
+
+
+@pytest.mark.parametrize("damage", ["truncate", "magic"])
+def test_corrupt_pack_raises_its_own_error(tmp_path, damage):
+    path = build(tmp_path)
+    data = open(path, "rb").read()
+    data = data[:-8] if damage == "truncate" else b"NOTAPACK" + data[8:]
+    with open(path, "wb") as f:
+        f.write(data)
+    # The real error, not a BufferError from unmapping with live views
+    with pytest.raises(ValueError):
+        packs.WordlistPack(path)
+
+
+def test_unreadable_pack_is_reported_once(tmp_path, capsys):
+    path = build(tmp_path)
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 8)
+    assert packs.get_pack(str(tmp_path)) is None
+    assert packs.get_pack(str(tmp_path)) is None
+    assert capsys.readouterr().out.count("Ignoring unreadable pack") == 1
+
+    build(tmp_path)
+    assert packs.get_pack(str(tmp_path)) is not None
@@ -0,0 +1,26 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "py"))
+
+from WildPromptor_RecordIndex import RecordIndex, clean_line  # noqa: E402
+
+
+def test_sidecar_is_mapped_and_matches_splitlines(tmp_path):
+    path = tmp_path / "prompts.txt"
+    text = "red dress,\r\n\r\n  blue hat \n green scarf"
+    path.write_bytes(text.encode("utf-8"))
+    expected = [clean_line(line) for line in text.splitlines() if clean_line(line)]
+
+    built = RecordIndex.open(str(path))
+    reopened = RecordIndex.open(str(path))
+    assert isinstance(reopened.offsets, memoryview)
+    assert built.records(range(len(built))) == reopened.records(range(len(reopened))) == expected
+
+
+def test_stale_sidecar_is_rebuilt(tmp_path):
+    path = tmp_path / "prompts.txt"
+    path.write_text("a;b", encoding="utf-8")
+    assert len(RecordIndex.open(str(path), ";")) == 2
+    path.write_text("a;b;c;d", encoding="utf-8")
+    assert RecordIndex.open(str(path), ";").records(range(4)) == ["a", "b", "c", "d"]
@@ -0,0 +1,31 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "py"))
+
+from WildPromptor_Template import check_template, compile_template  # noqa: E402
+
+
+def test_wildcard_names_with_spaces():
+    template = compile_template("__Environment/Weather and Sky__, __Subject/Female__")
+    assert template.wildcards() == ["Environment/Weather and Sky", "Subject/Female"]
+    assert check_template("__Weather and Sky__") is True
+    assert all(prompt for prompt in template.expand(4, seed=1))
+
+
+def test_leftover_wildcard_text_is_reported():
+    assert check_template("__ Weather and Sky__, red") == "Not a valid wildcard: __ Weather and Sky__"
+    assert check_template("a ____ b") is True
+
+
+def test_titled_lines_expand_to_their_content(tmp_path, monkeypatch):
+    import WildPromptor_Template as templates
+    from WildPromptor_Wordlist import WordlistStore
+
+    (tmp_path / "Looks").mkdir()
+    (tmp_path / "Looks" / "1_1.Outfits.txt").write_text("Formal - black suit, tie\nCasual - jeans\n", encoding="utf-8")
+    store = WordlistStore(str(tmp_path), use_packs=False)
+    monkeypatch.setattr(templates, "get_store", lambda: store)
+
+    prompts = templates.compile_template("__Looks/Outfits__").expand(16, seed=3)
+    assert set(prompts) == {"black suit, tie", "jeans"}
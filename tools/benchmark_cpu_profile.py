@@ -0,0 +1,109 @@
+"""Compare CPU generation speed and memory of an fp32 model against its dynamic int8 version.
+
+Run from the ComfyUI Python environment:
+
+    python tools/benchmark_cpu_profile.py Gustavosta/MagicPrompt-Stable-Diffusion
+    python tools/benchmark_cpu_profile.py 1038lab/Prompt-Enhance --seq2seq --threads 8
+
+Each variant runs in its own subprocess so resident memory is measured cleanly.
+Quantized models are not cached here; the first int8 load includes quantization.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "AI"))
+
+PROMPTS = [
+    "a castle on a cliff at sunset",
+    "portrait of an old sailor, oil painting",
+    "cyberpunk street market in the rain",
+    "a quiet forest lake with morning fog",
+]
+
+
+def rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        import resource
+        # ru_maxrss is peak RSS in KB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_variant(args):
+    import torch
+    import transformers
+    from WildPromptor_CpuProfile import apply_thread_settings, inference_context, quantize
+
+    profile = {"num_threads": args.threads, "interop_threads": args.interop_threads, "inference_mode": True}
+    apply_thread_settings(profile)
+    model_class = transformers.AutoModelForSeq2SeqLM if args.seq2seq else transformers.AutoModelForCausalLM
+
+    start_time = time.perf_counter()
+    model = model_class.from_pretrained(args.model)
+    if args.variant == "int8":
+        model = quantize(model)
+    model.eval()
+    load_seconds = time.perf_counter() - start_time
+
+    tokenizer = transformers.AutoTokenizer.from_pretrained(args.model)
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+
+    new_tokens = 0
+    start_time = time.perf_counter()
+    with inference_context(profile):
+        for _ in range(args.repeats):
+            for prompt in PROMPTS:
+                inputs = tokenizer(prompt, return_tensors="pt")
+                outputs = model.generate(**inputs, max_new_tokens=args.max_new_tokens, min_new_tokens=args.max_new_tokens,
+                                         do_sample=False, pad_token_id=tokenizer.pad_token_id)
+                new_tokens += outputs.shape[-1] - (0 if args.seq2seq else inputs["input_ids"].shape[-1])
+    seconds = time.perf_counter() - start_time
+
+    print(json.dumps({
+        "variant": args.variant,
+        "load_seconds": round(load_seconds, 2),
+        "tokens_per_second": round(new_tokens / seconds, 1),
+        "rss_mb": round(rss_mb(), 1),
+        "threads": torch.get_num_threads(),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("model", help="Hugging Face repo id or local model path")
+    parser.add_argument("--seq2seq", action="store_true", help="Load with AutoModelForSeq2SeqLM (e.g. the Enhancer model)")
+    parser.add_argument("--threads", type=int, default=0, help="torch.set_num_threads (0 = torch default)")
+    parser.add_argument("--interop-threads", type=int, default=0, help="torch.set_num_interop_threads (0 = torch default)")
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--repeats", type=int, default=2)
+    parser.add_argument("--variant", choices=["fp32", "int8"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        run_variant(args)
+        return
+
+    results = []
+    for variant in ("fp32", "int8"):
+        command = [sys.executable, os.path.abspath(__file__)] + sys.argv[1:] + ["--variant", variant]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'variant':<8}{'load s':>10}{'tokens/s':>12}{'RSS MB':>10}")
+    for result in results:
+        print(f"{result['variant']:<8}{result['load_seconds']:>10}{result['tokens_per_second']:>12}{result['rss_mb']:>10}")
+    fp32, int8 = results
+    if fp32["tokens_per_second"]:
+        print(f"int8 speedup: {int8['tokens_per_second'] / fp32['tokens_per_second']:.2f}x, "
+              f"RSS change: {int8['rss_mb'] - fp32['rss_mb']:+.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
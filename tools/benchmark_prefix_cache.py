@@ -0,0 +1,96 @@
+"""Measure HFgpt batch latency with and without the cached prompt-template prefix.
+
+Run from the ComfyUI Python environment:
+
+    python tools/benchmark_prefix_cache.py Gustavosta/MagicPrompt-Stable-Diffusion
+    python tools/benchmark_prefix_cache.py microsoft/Promptist --batch-size 16 --threads 8
+
+Both variants run the same batches of templated keyword prompts through
+`generate` with greedy decoding and the same number of new tokens, so the
+difference is prefill work on the shared prefix minus the cost of copying the
+cached keys/values into each batch. Short generations show it most clearly.
+
+The greedy outputs of both variants are also compared. Only turn on
+"prefix_cache" in config_ai.json for a model where they are identical and the
+cached variant is faster.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "AI"))
+
+KEYWORDS = [
+    "castle, cliff, sunset",
+    "old sailor, portrait, oil painting",
+    "cyberpunk street market, rain, neon",
+    "forest lake, morning fog",
+    "red fox in snow",
+    "astronaut riding a horse, desert",
+    "steampunk airship, clouds, brass",
+    "tiny cottage, flower garden, watercolor",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("model", help="Hugging Face repo id or local path of a causal LM")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--max-new-tokens", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=0, help="torch.set_num_threads (0 = torch default)")
+    args = parser.parse_args()
+
+    import torch
+    import transformers
+    from WildPromptorAI import WildPromptorAI
+    from WildPromptor_PrefixCache import PrefixCache
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    model = transformers.AutoModelForCausalLM.from_pretrained(args.model).eval()
+    tokenizer = transformers.AutoTokenizer.from_pretrained(args.model)
+    tokenizer.padding_side = "left"
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+
+    template = WildPromptorAI.__new__(WildPromptorAI)
+    prompts = [template.format_prompt(KEYWORDS[i % len(KEYWORDS)]) for i in range(args.batch_size)]
+    prefix_cache = PrefixCache(model, tokenizer, WildPromptorAI.PROMPT_PREFIX)
+    suffixes = prefix_cache.split(tokenizer, prompts)
+    if suffixes is None:
+        sys.exit("The prompts don't tokenize to the cached prefix plus a suffix for this tokenizer")
+
+    def run(cached):
+        if cached:
+            inputs = prefix_cache.build_inputs(suffixes, tokenizer.pad_token_id, model.device)
+        else:
+            inputs = tokenizer(prompts, return_tensors="pt", padding=True)
+        outputs = model.generate(**inputs, max_new_tokens=args.max_new_tokens, min_new_tokens=args.max_new_tokens,
+                                 do_sample=False, pad_token_id=tokenizer.pad_token_id)
+        return outputs[:, inputs["input_ids"].shape[1]:].tolist()
+
+    results = {}
+    with torch.inference_mode():
+        identical = run(False) == run(True)
+        for cached in (False, True, False, True):
+            run(cached)  # warm up allocator and kernels
+            start_time = time.perf_counter()
+            for _ in range(args.repeats):
+                run(cached)
+            seconds = (time.perf_counter() - start_time) / args.repeats
+            results[cached] = min(results.get(cached, seconds), seconds)
+
+    suffix_tokens = sum(len(s) for s in suffixes) / len(suffixes)
+    print(f"prefix tokens: {len(prefix_cache.prefix_ids)}, mean suffix tokens: {suffix_tokens:.1f}, "
+          f"batch size: {args.batch_size}, new tokens: {args.max_new_tokens}")
+    print(f"{'variant':<10}{'ms/batch':>10}")
+    print(f"{'uncached':<10}{results[False] * 1000:>10.1f}")
+    print(f"{'cached':<10}{results[True] * 1000:>10.1f}")
+    print(f"speedup: {results[False] / results[True]:.2f}x")
+    print(f"outputs identical: {'yes' if identical else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Compile data folders into memory-mapped wordlist packs.
+
+    python tools/build_wordlist_packs.py            # every folder under data/
+    python tools/build_wordlist_packs.py Subject Styles
+
+Each folder gets a `wordlists.wpack` holding all of its .txt lists. Nodes read
+a list from the pack while the .txt file's mtime and size match what was
+packed, and from the .txt file otherwise, so rebuild after editing lists to get
+the benefit back. Delete a pack to stop using it.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "py"))
+
+from WildPromptor_Pack import build_pack
+from WildPromptor_Wordlist import get_store
+
+
+def main():
+    store = get_store()
+    folders = sys.argv[1:] or store.folder_names()
+    for folder in folders:
+        folder_path = os.path.join(store.data_path, folder)
+        if not os.path.isdir(folder_path):
+            print(f"Skipping {folder}: not a folder under {store.data_path}")
+            continue
+        start_time = time.perf_counter()
+        pack_path, line_count = build_pack(folder_path)
+        size_kb = os.path.getsize(pack_path) / 1024
+        print(f"{folder}: {line_count} lines, {size_kb:.0f} KB in {time.perf_counter() - start_time:.2f}s -> {pack_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,16 @@
 import { app } from "/scripts/app.js";
 import { ComfyWidgets } from "/scripts/widgets.js";
+import { api } from "/scripts/api.js";
+
+// AI nodes with `stream` enabled send their partial output as "wildpromptor.stream" events;
+// show it in every Show Prompt node whose input is connected to the generating node.
+api.addEventListener("wildpromptor.stream", ({ detail }) => {
+    for (const node of app.graph?._nodes ?? []) {
+        if (node.type === "WildPromptor_ShowPrompt" && String(node.getInputNode?.(0)?.id) === detail.node) {
+            node.showStreamText?.(detail.text);
+        }
+    }
+});
 
 app.registerExtension({
     name: "WildPromptor.WildPromptor_ShowPrompt",
@@ -43,6 +54,17 @@ app.registerExtension({
                 }, 0);
             }
 
+            // Streaming updates replace the first shown text in place; onExecuted re-renders the final result
+            nodeType.prototype.showStreamText = function (text) {
+                const widget = this.widgets?.find((w) => w.name?.startsWith("show_"));
+                if (widget) {
+                    widget.value = text;
+                    app.graph.setDirtyCanvas(true, false);
+                } else {
+                    renderString.call(this, [text]);
+                }
+            };
+
             // `onExecuted` is called when the node finishes running
             nodeType.prototype.onExecuted = function (msg) {
                 // --- FIX 2 ---
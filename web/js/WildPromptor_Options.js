@@ -0,0 +1,90 @@
+import { app } from "/scripts/app.js";
+import { api } from "/scripts/api.js";
+
+// Lists longer than config.json "inline_option_limit" are not inlined in /object_info.
+// Their combo widgets carry a "wildpromptor_remote" option and load values on first open.
+const PAGE_SIZE = 1000;
+const optionCache = new Map();
+
+async function fetchAllOptions(remote) {
+    const cacheKey = `${remote.folder}/${remote.name}/${remote.field}`;
+    if (optionCache.has(cacheKey)) {
+        return optionCache.get(cacheKey);
+    }
+
+    const request = (async () => {
+        const values = [];
+        let total = Infinity;
+        while (values.length < total) {
+            const params = new URLSearchParams({
+                folder: remote.folder,
+                name: remote.name,
+                field: remote.field,
+                offset: values.length,
+                limit: PAGE_SIZE,
+            });
+            const response = await fetch(`/wildpromptor/options?${params}`);
+            if (!response.ok) {
+                throw new Error(`Failed to fetch options: ${response.status}`);
+            }
+            const page = await response.json();
+            total = page.total;
+            if (!page.options.length) break;
+            values.push(...page.options);
+        }
+        return values;
+    })();
+
+    optionCache.set(cacheKey, request);
+    request.catch(() => optionCache.delete(cacheKey));
+    return request;
+}
+
+// The server's wordlist watcher reports edited, added or removed list files;
+// refetch node definitions so combo lists update without a restart.
+api.addEventListener("wildpromptor.wordlists_changed", () => {
+    optionCache.clear();
+    app.refreshComboInNodes?.();
+});
+
+app.registerExtension({
+    name: "WildPromptor.RemoteOptions",
+    async beforeRegisterNodeDef(nodeType, nodeData, app) {
+        const inputs = { ...nodeData.input?.required, ...nodeData.input?.optional };
+        const remoteInputs = Object.entries(inputs)
+            .filter(([, spec]) => Array.isArray(spec) && spec[1]?.wildpromptor_remote)
+            .map(([name, spec]) => [name, spec[1].wildpromptor_remote]);
+        if (!remoteInputs.length) return;
+
+        const originalNodeCreated = nodeType.prototype.onNodeCreated;
+        nodeType.prototype.onNodeCreated = function () {
+            originalNodeCreated?.apply(this, arguments);
+
+            for (const [name, remote] of remoteInputs) {
+                const widget = this.widgets?.find((w) => w.name === name);
+                if (!widget) continue;
+
+                const baseValues = [...widget.options.values];
+                let loaded = null;
+                let loading = false;
+
+                // LiteGraph accepts a function for combo values; it is called each time the list opens
+                widget.options.values = () => {
+                    if (!loaded && !loading) {
+                        loading = true;
+                        fetchAllOptions(remote)
+                            .then((values) => {
+                                loaded = baseValues.concat(values);
+                                app.graph.setDirtyCanvas(true, false);
+                            })
+                            .catch((error) => console.error("WildPromptor: error fetching options", error))
+                            .finally(() => {
+                                loading = false;
+                            });
+                    }
+                    return loaded ?? baseValues;
+                };
+            }
+        };
+    },
+});